@@ -13,8 +13,30 @@ import subprocess
 import sys
 import importlib.metadata
 import os
+import re
 from pathlib import Path
 
+# Leading distribution name of a requirements line (drops extras, specifiers and markers)
+_PKG_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9_.\-]*)')
+
+
+def _canonicalize_name(name):
+    """Normalize a distribution name per PEP 503 (case, '-', '_' and '.' are equivalent)"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _is_installed(pkg_name):
+    """Check a distribution via targeted metadata lookups, retrying alternate spellings of the name"""
+    alt_name = pkg_name.replace('-', '_') if '-' in pkg_name else pkg_name.replace('_', '-')
+    for name in dict.fromkeys((pkg_name, alt_name, _canonicalize_name(pkg_name))):
+        try:
+            importlib.metadata.version(name)
+            return True
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return False
+
+
 # Check and install required packages on startup
 def check_requirements():
     """Check if all required packages are installed, install if missing"""
@@ -23,41 +45,37 @@ def check_requirements():
     if not requirements_file.exists():
         return True
 
-    # Map pip package names to import names
-    pip_to_import = {
-        "tavily-python": "tavily",
-        "huggingface_hub": "huggingface_hub",
-        "huggingface-hub": "huggingface_hub",
-    }
+    # Skip the scan when requirements.txt hasn't changed since the last successful check
+    marker_file = requirements_file.with_name(".requirements_ok")
+    req_mtime = str(requirements_file.stat().st_mtime)
+    try:
+        if marker_file.read_text().strip() == req_mtime:
+            return True
+    except OSError:
+        pass
 
     missing = []
 
     with open(requirements_file, 'r') as f:
         for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
+            # Drop inline comments too: pip rejects "pkg>=1.0  # note" passed as an argument
+            line = line.split('#', 1)[0].strip()
+            if not line:
                 continue
 
-            # Get package name without version specifiers
-            pkg_name = line.split('==')[0].split('>=')[0].split('<=')[0].split('<')[0].split('>')[0].strip()
-            import_name = pip_to_import.get(pkg_name, pkg_name.replace('-', '_'))
-
-            # Check if installed using importlib.metadata
-            try:
-                importlib.metadata.version(pkg_name)
-            except importlib.metadata.PackageNotFoundError:
-                # Also try with underscores/hyphens swapped
-                alt_name = pkg_name.replace('-', '_') if '-' in pkg_name else pkg_name.replace('_', '-')
-                try:
-                    importlib.metadata.version(alt_name)
-                except importlib.metadata.PackageNotFoundError:
-                    missing.append(pkg_name)
+            m = _PKG_RE.match(line)
+            if not m:
+                continue
+            pkg_name = m.group(1)
+
+            if not _is_installed(pkg_name):
+                missing.append((pkg_name, line))
 
     if missing:
-        print(f"[Workflow-Models-Downloader] Installing missing packages: {', '.join(missing)}")
+        print(f"[Workflow-Models-Downloader] Installing missing packages: {', '.join(name for name, _ in missing)}")
         try:
             subprocess.check_call(
-                [sys.executable, "-m", "pip", "install", "-r", str(requirements_file), "-q"],
+                [sys.executable, "-m", "pip", "install", "-q"] + [spec for _, spec in missing],
                 stdout=subprocess.DEVNULL
             )
             print(f"[Workflow-Models-Downloader] Packages installed successfully")
@@ -65,6 +83,11 @@ def check_requirements():
             print(f"[Workflow-Models-Downloader] Failed to install packages: {e}")
             return False
 
+    try:
+        marker_file.write_text(req_mtime)
+    except OSError:
+        pass
+
     return True
 
 # Run check before any other imports
@@ -5,22 +5,90 @@ Server-side API endpoints for Workflow Models Downloader
 import os
 import re
 import glob
+import hashlib
+import itertools
 import json
 import logging
 import asyncio
+import queue
+import atexit
+import contextlib
 import datetime
 import requests
 import threading
 import time
 import urllib.parse
 import urllib.request
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
 from aiohttp import web
 from logging.handlers import RotatingFileHandler
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import folder_paths
 from server import PromptServer
 
+def _json_dumps_stdlib(obj, indent=False):
+    if indent:
+        return json.dumps(obj, indent=2)
+    # Compact like orjson: state caches and responses are never hand-edited
+    return json.dumps(obj, separators=(',', ':'))
+
+
+# Optional fast JSON codec for API responses and state files (falls back to stdlib json)
+try:
+    import orjson
+
+    def _json_dumps(obj, indent=False):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+        except TypeError:
+            # orjson.JSONEncodeError: e.g. lone surrogates from undecodable filenames, which stdlib escapes
+            return _json_dumps_stdlib(obj, indent)
+
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_dumps = _json_dumps_stdlib
+    _json_loads = json.loads
+
+
+def _json_loads_lenient(data):
+    """Parse JSON from outside sources and state files; stdlib also accepts NaN/Infinity and lone surrogates"""
+    try:
+        return _json_loads(data)
+    except ValueError:
+        return json.loads(data)
+
+
+def set_aside_unreadable(path):
+    """Rename a state file that failed to load, so the next save can't overwrite the only copy"""
+    backup_path = f"{path}.unreadable-{int(time.time())}"
+    try:
+        os.replace(path, backup_path)
+        logging.warning(f"[WMD] Kept unreadable {os.path.basename(path)} as {backup_path}")
+    except OSError as e:
+        logging.error(f"[WMD] Could not set aside unreadable {path}: {e}")
+
+
+def write_text_atomic(path, text, durable=False):
+    """Write a state file via temp file + os.replace; durable=True fsyncs first (settings, history, not caches)"""
+    # Per-thread temp name: saves can race between request handlers and download threads
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
 # Get routes from ComfyUI server
 routes = PromptServer.instance.routes
 
@@ -92,7 +160,7 @@ def get_latest_version():
     """Get latest version from GitHub releases API"""
     try:
         url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-        response = requests.get(url, timeout=5)
+        response = http_session.get(url, timeout=5)
         if response.status_code == 200:
             data = response.json()
             tag = data.get('tag_name', '')
@@ -128,6 +196,32 @@ DOWNLOAD_HISTORY_FILE = os.path.join(EXTENSION_PATH, 'download_history.json')
 # Tavily search cache file for persistent caching of advanced search results
 TAVILY_CACHE_FILE = os.path.join(EXTENSION_PATH, 'tavily_cache.json')
 
+# Read size for streamed downloads (upper bound: read1() returns whatever has arrived)
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+# urllib3 < 2 has no read1() and read() blocks until the full size arrives, so read less at a time
+DOWNLOAD_BLOCKING_READ_SIZE = 1024 * 1024
+
+# Shared HTTP sessions keep TLS connections to HF/CivitAI alive between requests
+# instead of reconnecting every time.
+# API/HEAD calls (some run inside aiohttp handlers): no retries, so a failing host can't stall the event loop
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+http_session.mount('https://', _http_adapter)
+http_session.mount('http://', _http_adapter)
+
+# Download threads only: retry transient gateway errors before failing a multi-GB download
+download_session = requests.Session()
+_download_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False)
+)
+download_session.mount('https://', _download_adapter)
+download_session.mount('http://', _download_adapter)
+
+# Minimum seconds between byte-progress updates published by a download loop
+PROGRESS_UPDATE_INTERVAL = 0.25
+
 # Download progress tracking
 download_progress = {}
 download_lock = threading.Lock()
@@ -137,28 +231,53 @@ cancelled_downloads = set()  # Track cancelled download IDs
 download_history = []
 
 # Download queue system
-download_queue = []  # Queued downloads waiting to start
+download_queue = deque()  # Queued downloads waiting to start (FIFO)
 download_queue_lock = threading.Lock()
+download_queue_ids = itertools.count(1)  # Sequence for unique queued download IDs
 max_parallel_downloads = 3  # Default, configurable via settings
 active_download_count = 0
 
 # Model aliases file
 MODEL_ALIASES_FILE = os.path.join(EXTENSION_PATH, 'metadata', 'model-aliases.json')
 
-# Settings cache
+# Settings cache (invalidated when either settings source changes on disk)
 _settings_cache = None
+_settings_cache_mtimes = None
+
+
+def get_comfy_settings_path():
+    """Path to ComfyUI's native settings file"""
+    return os.path.join(folder_paths.base_path, 'user', 'default', 'comfy.settings.json')
+
+
+def _settings_mtimes():
+    """Modification times of the settings sources, used to detect external edits"""
+    mtimes = []
+    for path in (SETTINGS_FILE, get_comfy_settings_path()):
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
 
-# Fuzzy matching imports
+# Fuzzy matching imports (rapidfuzz optionally prefilters candidates; scores always come from SequenceMatcher)
 from difflib import SequenceMatcher
+try:
+    from rapidfuzz import fuzz as _rapidfuzz, process as _rapidfuzz_process
+except ImportError:
+    _rapidfuzz = None
+    _rapidfuzz_process = None
 import subprocess
 import shutil
 
 
 def load_settings():
     """Load settings from settings.json or ComfyUI's native settings"""
-    global _settings_cache
-    if _settings_cache is not None:
+    global _settings_cache, _settings_cache_mtimes
+    mtimes = _settings_mtimes()
+    if _settings_cache is not None and mtimes == _settings_cache_mtimes:
         return _settings_cache
+    _settings_cache_mtimes = mtimes
 
     default_settings = {
         'huggingface_token': '',
@@ -181,7 +300,7 @@ def load_settings():
 
     # Fall back to ComfyUI's native settings
     try:
-        comfy_settings_path = os.path.join(folder_paths.base_path, 'user', 'default', 'comfy.settings.json')
+        comfy_settings_path = get_comfy_settings_path()
         if os.path.exists(comfy_settings_path):
             with open(comfy_settings_path, 'r', encoding='utf-8') as f:
                 comfy_settings = json.load(f)
@@ -204,11 +323,11 @@ def load_settings():
 
 def save_settings(settings):
     """Save settings to settings.json"""
-    global _settings_cache
+    global _settings_cache, _settings_cache_mtimes
     try:
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2)
+        write_text_atomic(SETTINGS_FILE, json.dumps(settings, indent=2), durable=True)
         _settings_cache = settings
+        _settings_cache_mtimes = _settings_mtimes()
         logging.info("[Workflow-Models-Downloader] Settings saved")
         return True
     except Exception as e:
@@ -222,11 +341,12 @@ def load_download_history():
     try:
         if os.path.exists(DOWNLOAD_HISTORY_FILE):
             with open(DOWNLOAD_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                download_history = json.load(f)
+                download_history = _json_loads_lenient(f.read())
                 logging.info(f"[WMD] Loaded {len(download_history)} download history entries")
                 return download_history
     except Exception as e:
         logging.error(f"[WMD] Error loading download history: {e}")
+        set_aside_unreadable(DOWNLOAD_HISTORY_FILE)
     download_history = []
     return download_history
 
@@ -235,8 +355,7 @@ def save_download_history():
     """Save download history to file"""
     global download_history
     try:
-        with open(DOWNLOAD_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(download_history, f, indent=2)
+        write_text_atomic(DOWNLOAD_HISTORY_FILE, _json_dumps(download_history), durable=True)
         return True
     except Exception as e:
         logging.error(f"[WMD] Error saving download history: {e}")
@@ -252,11 +371,12 @@ def load_tavily_cache():
     try:
         if os.path.exists(TAVILY_CACHE_FILE):
             with open(TAVILY_CACHE_FILE, 'r', encoding='utf-8') as f:
-                _tavily_cache = json.load(f)
+                _tavily_cache = _json_loads_lenient(f.read())
                 logging.info(f"[WMD] Loaded Tavily cache with {len(_tavily_cache)} entries")
                 return _tavily_cache
     except Exception as e:
         logging.error(f"[WMD] Error loading Tavily cache: {e}")
+        set_aside_unreadable(TAVILY_CACHE_FILE)
     _tavily_cache = {}
     return _tavily_cache
 
@@ -265,8 +385,8 @@ def save_tavily_cache():
     """Save Tavily search cache to file"""
     global _tavily_cache
     try:
-        with open(TAVILY_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_tavily_cache, f, indent=2)
+        # Compact encoding: this file holds raw search responses and is never hand-edited
+        write_text_atomic(TAVILY_CACHE_FILE, _json_dumps(_tavily_cache))
         return True
     except Exception as e:
         logging.error(f"[WMD] Error saving Tavily cache: {e}")
@@ -310,14 +430,10 @@ def add_to_download_history(download_info):
             invalidate_folder_cache(folder_type)
             logging.info(f"[WMD] Download complete, cache invalidated for: {folder_type}")
 
-    # Remove any existing entry with same filename to avoid duplicates
-    download_history = [h for h in download_history if h.get('filename') != entry['filename']]
-
-    # Add new entry at the beginning
-    download_history.insert(0, entry)
-
-    # Keep only last 100 entries
-    download_history = download_history[:100]
+    # New entry first, drop any older entry for the same file, keep only the last 100
+    filename = entry['filename']
+    previous = (h for h in download_history if h.get('filename') != filename)
+    download_history = [entry, *itertools.islice(previous, 99)]
 
     save_download_history()
 
@@ -336,9 +452,7 @@ def get_huggingface_token():
 
 
 def get_civitai_api_key():
-    """Get CivitAI API key from settings (force reload to get latest)"""
-    global _settings_cache
-    _settings_cache = None  # Force reload to get latest settings
+    """Get CivitAI API key from settings (reloaded if the settings file changed)"""
     settings = load_settings()
     key = settings.get('civitai_api_key', '')
     if key:
@@ -348,6 +462,19 @@ def get_civitai_api_key():
     return key
 
 
+# URL patterns for HuggingFace / CivitAI links
+CIVITAI_URN_RE = re.compile(r'^urn:air:[^:]+:[^:]+:civitai:(\d+)@(\d+)$')
+CIVITAI_MODEL_ID_RE = re.compile(r'civitai\.com/models/(\d+)')
+CIVITAI_MODELS_PATH_RE = re.compile(r'/models/(\d+)')
+CIVITAI_VERSION_ID_RE = re.compile(r'modelVersionId[=:](\d+)')
+CIVITAI_DOWNLOAD_HREF_RE = re.compile(r'href="(/api/download/models/\d+[^"]*)"')
+HF_REPO_RE = re.compile(r'huggingface\.co/([^/]+/[^/]+)')
+HF_REPO_PATH_RE = re.compile(r'huggingface\.co/([^/]+/[^/]+)(?:/(?:resolve|blob)/[^/]+)?(?:/(.+))?')
+HF_FILE_URL_RE = re.compile(r'huggingface\.co/([^/]+/[^/]+)/(?:resolve|blob)/[^/]+/(.+?)(?:\?|$)')
+HF_RESOLVE_PATH_RE = re.compile(r'huggingface\.co/([^/]+/[^/]+)(?:/resolve/[^/]+)?/(.+?)(?:\?|$)')
+CONTENT_DISPOSITION_FILENAME_RE = re.compile(r'filename[*]?=["\']?([^"\';\n]+)')
+
+
 def parse_civitai_urn(urn_string):
     """
     Parse CivitAI URN format: urn:air:other:unknown:civitai:MODEL_ID@VERSION_ID
@@ -358,8 +485,7 @@ def parse_civitai_urn(urn_string):
 
     # Pattern: urn:air:other:unknown:civitai:MODEL_ID@VERSION_ID
     # Also support: urn:air:MODEL_TYPE:BASE_MODEL:civitai:MODEL_ID@VERSION_ID
-    urn_pattern = r'^urn:air:[^:]+:[^:]+:civitai:(\d+)@(\d+)$'
-    match = re.match(urn_pattern, urn_string)
+    match = CIVITAI_URN_RE.match(urn_string)
     if match:
         return match.group(1), match.group(2)
 
@@ -386,10 +512,7 @@ def is_civitai_urn(value):
 
 
 def get_tavily_api_key():
-    """Get Tavily API key from settings"""
-    global _settings_cache
-    # Force reload settings to get latest key
-    _settings_cache = None
+    """Get Tavily API key from settings (reloaded if the settings file changed)"""
     settings = load_settings()
     key = settings.get('tavily_api_key', '')
     logging.info(f"[WMD] Tavily key loaded: {'*' * (len(key) - 4) + key[-4:] if key else 'NOT SET'}")
@@ -418,11 +541,23 @@ def get_cached_metadata(filename):
 
 def save_search_metadata(filename, metadata):
     """Save search metadata for a filename to model_metadata.json"""
-    basename = os.path.basename(filename)
-    metadata['cached_at'] = datetime.datetime.now().isoformat()
+    save_search_metadata_batch([(filename, metadata)])
+
 
-    # Update model_metadata.json
+def save_search_metadata_batch(updates):
+    """Merge several (filename, metadata) updates into model_metadata.json with a single save"""
+    if not updates:
+        return
     all_metadata = _get_model_metadata_safe()
+    for filename, metadata in updates:
+        _merge_search_metadata(all_metadata, filename, metadata)
+    _save_model_metadata_safe(all_metadata)
+
+
+def _merge_search_metadata(all_metadata, filename, metadata):
+    """Merge search metadata for a filename into the loaded model_metadata.json dict"""
+    basename = os.path.basename(filename)
+    metadata['cached_at'] = datetime.datetime.now().isoformat()
     existing = all_metadata.get(basename, {})
 
     # Merge new metadata (don't overwrite user_url)
@@ -434,7 +569,6 @@ def save_search_metadata(filename, metadata):
 
     existing['filename'] = basename
     all_metadata[basename] = existing
-    _save_model_metadata_safe(all_metadata)
 
 
 def _get_model_metadata_safe():
@@ -445,31 +579,50 @@ def _get_model_metadata_safe():
     try:
         model_metadata_file = os.path.join(os.path.dirname(__file__), "model_metadata.json")
         if os.path.exists(model_metadata_file):
-            with open(model_metadata_file, 'r', encoding='utf-8') as f:
-                _model_metadata_cache = json.load(f)
+            with open(model_metadata_file, 'rb') as f:
+                # Lenient: stdlib json writes undecodable filenames as lone-surrogate keys orjson rejects
+                _model_metadata_cache = _json_loads_lenient(f.read())
                 return _model_metadata_cache
     except Exception as e:
         logging.error(f"[WMD] Error loading model metadata: {e}")
+        set_aside_unreadable(model_metadata_file)
     _model_metadata_cache = {}
     return _model_metadata_cache
 
 
 def _save_model_metadata_safe(metadata):
     """Safe wrapper to save model metadata"""
-    global _model_metadata_cache
+    global _model_metadata_cache, _model_metadata_lower_index
     try:
         model_metadata_file = os.path.join(os.path.dirname(__file__), "model_metadata.json")
-        with open(model_metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        write_text_atomic(model_metadata_file, _json_dumps(metadata, indent=True))
         _model_metadata_cache = metadata
+        _model_metadata_lower_index = None
         return True
     except Exception as e:
         logging.error(f"[WMD] Error saving model metadata: {e}")
         return False
 
 
+def find_model_metadata_key(filename):
+    """Case-insensitive lookup of a model_metadata.json key by full key or basename"""
+    global _model_metadata_lower_index
+    metadata = _get_model_metadata_safe()
+    index = _model_metadata_lower_index
+    # Rebuild when the cache dict was replaced or entries were added/removed without a save
+    if index is None or index[0] is not metadata or index[1] != len(metadata):
+        lower_keys = {}
+        for key in metadata:
+            lower_keys.setdefault(key.lower(), key)
+            lower_keys.setdefault(os.path.basename(key).lower(), key)
+        index = _model_metadata_lower_index = (metadata, len(metadata), lower_keys)
+    return index[2].get(filename.lower())
+
+
 # Global cache for model metadata (shared with functions defined later)
 _model_metadata_cache = None
+# (metadata dict, entry count, {lowercased key or basename: key}) built by find_model_metadata_key
+_model_metadata_lower_index = None
 
 
 def _cache_download_url(filename, url, source, hf_repo=None, hf_path=None, model_name=None, civitai_url=None):
@@ -500,6 +653,8 @@ logging.info("[Workflow-Models-Downloader] Loading extension...")
 
 # Cache for metadata
 _model_list_cache = None
+# Lowercased filename -> first model-list.json entry with that filename
+_model_list_filename_index = {}
 _extension_node_map_cache = None
 
 
@@ -525,7 +680,7 @@ def get_metadata_path():
 
 def load_model_list():
     """Load model-list.json from metadata"""
-    global _model_list_cache
+    global _model_list_cache, _model_list_filename_index
     if _model_list_cache is not None:
         return _model_list_cache
 
@@ -538,9 +693,12 @@ def load_model_list():
     try:
         model_list_path = os.path.join(metadata_path, 'model-list.json')
         if os.path.exists(model_list_path):
-            with open(model_list_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(model_list_path, 'rb') as f:
+                data = _json_loads(f.read())
                 _model_list_cache = data.get('models', [])
+                _model_list_filename_index = {}
+                for model in _model_list_cache:
+                    _model_list_filename_index.setdefault(model.get('filename', '').lower(), model)
                 logging.info(f"[Workflow-Models-Downloader] Loaded {len(_model_list_cache)} models from model-list.json")
                 return _model_list_cache
     except Exception as e:
@@ -564,8 +722,8 @@ def load_extension_node_map():
     try:
         map_path = os.path.join(metadata_path, 'extension-node-map.json')
         if os.path.exists(map_path):
-            with open(map_path, 'r', encoding='utf-8') as f:
-                _extension_node_map_cache = json.load(f)
+            with open(map_path, 'rb') as f:
+                _extension_node_map_cache = _json_loads(f.read())
                 logging.info(f"[Workflow-Models-Downloader] Loaded {len(_extension_node_map_cache)} extensions from extension-node-map.json")
                 return _extension_node_map_cache
     except Exception as e:
@@ -575,31 +733,34 @@ def load_extension_node_map():
     return _extension_node_map_cache
 
 
-def lookup_model_in_model_list(filename):
-    """Look up model info from model-list.json by filename"""
-    models = load_model_list()
-    filename_lower = filename.lower()
+def get_model_list_entry(filename):
+    """Get the model-list.json entry for a filename (case-insensitive)"""
+    load_model_list()
+    return _model_list_filename_index.get(filename.lower())
 
-    for model in models:
-        if model.get('filename', '').lower() == filename_lower:
-            model_type = model.get('type', '')
-            save_path = model.get('save_path', '')
-
-            # Handle 'default' save_path - map to appropriate directory
-            if save_path == 'default':
-                type_to_dir = {
-                    'upscale': 'upscale_models',
-                    'TAESD': 'vae_approx',
-                    'controlnet': 'controlnet',
-                    'checkpoint': 'checkpoints',
-                    'lora': 'loras',
-                    'vae': 'vae',
-                }
-                save_path = type_to_dir.get(model_type, 'models')
 
-            return model_type, save_path, model.get('url', ''), model.get('size', '')
+def lookup_model_in_model_list(filename):
+    """Look up model info from model-list.json by filename"""
+    model = get_model_list_entry(filename)
+    if model is None:
+        return None, None, None, None
+
+    model_type = model.get('type', '')
+    save_path = model.get('save_path', '')
+
+    # Handle 'default' save_path - map to appropriate directory
+    if save_path == 'default':
+        type_to_dir = {
+            'upscale': 'upscale_models',
+            'TAESD': 'vae_approx',
+            'controlnet': 'controlnet',
+            'checkpoint': 'checkpoints',
+            'lora': 'loras',
+            'vae': 'vae',
+        }
+        save_path = type_to_dir.get(model_type, 'models')
 
-    return None, None, None, None
+    return model_type, save_path, model.get('url', ''), model.get('size', '')
 
 
 def lookup_node_github_url(node_type):
@@ -630,6 +791,8 @@ else:
 
 # Cache for popular models registry
 _popular_models_cache = None
+# Lowercased popular model name -> registry key, built once when the registry loads
+_popular_models_lower_index = {}
 
 # Cache for API search results
 _url_search_cache = {}
@@ -637,16 +800,19 @@ _url_search_cache = {}
 
 def load_popular_models():
     """Load the curated popular-models.json registry"""
-    global _popular_models_cache
+    global _popular_models_cache, _popular_models_lower_index
     if _popular_models_cache is not None:
         return _popular_models_cache
 
     try:
         popular_path = os.path.join(EXTENSION_PATH, 'metadata', 'popular-models.json')
         if os.path.exists(popular_path):
-            with open(popular_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(popular_path, 'rb') as f:
+                data = _json_loads(f.read())
                 _popular_models_cache = data.get('models', {})
+                _popular_models_lower_index = {}
+                for name in _popular_models_cache:
+                    _popular_models_lower_index.setdefault(name.lower(), name)
                 logging.info(f"[Workflow-Models-Downloader] Loaded {len(_popular_models_cache)} popular models")
                 return _popular_models_cache
     except Exception as e:
@@ -656,21 +822,23 @@ def load_popular_models():
     return _popular_models_cache
 
 
-def lookup_url_in_popular_models(filename):
-    """Look up URL from curated popular models registry"""
+def get_popular_model_info(filename):
+    """Get a popular-models.json entry by exact, then case-insensitive, filename"""
     models = load_popular_models()
-    filename_lower = filename.lower()
+    info = models.get(filename)
+    if info is None:
+        name = _popular_models_lower_index.get(filename.lower())
+        if name is not None:
+            info = models[name]
+    return info
 
-    # Exact match
-    if filename in models:
-        return models[filename].get('url', '')
 
-    # Case-insensitive match
-    for name, info in models.items():
-        if name.lower() == filename_lower:
-            return info.get('url', '')
-
-    return None
+def lookup_url_in_popular_models(filename):
+    """Look up URL from curated popular models registry"""
+    info = get_popular_model_info(filename)
+    if info is None:
+        return None
+    return info.get('url', '')
 
 
 def lookup_url_in_model_list(filename):
@@ -680,15 +848,13 @@ def lookup_url_in_model_list(filename):
     filename_base = os.path.splitext(filename_lower)[0]
 
     # Exact match first
-    for model in models:
-        model_filename = model.get('filename', '')
-        if model_filename.lower() == filename_lower:
-            return model.get('url', '')
+    model = get_model_list_entry(filename)
+    if model is not None:
+        return model.get('url', '')
 
     # Fuzzy match - check if filename contains or is contained by model name
     for model in models:
-        model_filename = model.get('filename', '')
-        model_base = os.path.splitext(model_filename.lower())[0]
+        model_base = _fuzzy_base_name(model.get('filename', ''))
 
         # Check substring matches
         if filename_base in model_base or model_base in filename_base:
@@ -699,6 +865,10 @@ def lookup_url_in_model_list(filename):
     return None
 
 
+# Precision/variant suffix stripped from filenames before searching (e.g. "_fp16", "-pruned-emaonly")
+SEARCH_SUFFIX_RE = re.compile(r'[-_]?(fp16|fp8|bf16|e4m3fn|scaled|pruned|emaonly).*', re.IGNORECASE)
+
+
 def search_huggingface_api(filename):
     """Search HuggingFace API for a model file"""
     global _url_search_cache
@@ -712,7 +882,7 @@ def search_huggingface_api(filename):
         filename_base = os.path.splitext(filename)[0]
         search_url = f"https://huggingface.co/api/models?search={urllib.parse.quote(filename_base)}&limit=5"
 
-        response = requests.get(search_url, timeout=10)
+        response = http_session.get(search_url, timeout=10)
         if response.status_code == 200:
             repos = response.json()
 
@@ -724,7 +894,7 @@ def search_huggingface_api(filename):
                 # Check if this repo has the file
                 files_url = f"https://huggingface.co/api/models/{repo_id}/tree/main"
                 try:
-                    files_response = requests.get(files_url, timeout=10)
+                    files_response = http_session.get(files_url, timeout=10)
                     if files_response.status_code == 200:
                         files = files_response.json()
                         for file_info in files:
@@ -755,11 +925,11 @@ def search_civitai_api(filename):
         # Search by filename
         filename_base = os.path.splitext(filename)[0]
         # Remove common suffixes for better search
-        search_name = re.sub(r'[-_]?(fp16|fp8|bf16|e4m3fn|scaled|pruned|emaonly).*', '', filename_base, flags=re.IGNORECASE)
+        search_name = SEARCH_SUFFIX_RE.sub('', filename_base)
 
         search_url = f"https://civitai.com/api/v1/models?query={urllib.parse.quote(search_name)}&limit=5"
 
-        response = requests.get(search_url, timeout=10)
+        response = http_session.get(search_url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             items = data.get('items', [])
@@ -800,7 +970,9 @@ def search_tavily_api(filename):
         # Build search query focused on finding download URLs
         filename_base = os.path.splitext(filename)[0]
         # Clean up common suffixes for better search
-        search_name = re.sub(r'[-_]?(fp16|fp8|bf16|e4m3fn|scaled|pruned|emaonly).*', '', filename_base, flags=re.IGNORECASE)
+        search_name = SEARCH_SUFFIX_RE.sub('', filename_base)
+        filename_lower = filename.lower()
+        filename_base_lower = filename_base.lower()
 
         search_query = f"{search_name} safetensors download huggingface OR civitai"
 
@@ -813,7 +985,7 @@ def search_tavily_api(filename):
             "max_results": 10
         }
 
-        response = requests.post(url, json=payload, timeout=15)
+        response = http_session.post(url, json=payload, timeout=15)
 
         if response.status_code == 200:
             data = response.json()
@@ -829,23 +1001,23 @@ def search_tavily_api(filename):
                 if 'huggingface.co' in result_url:
                     # Try to construct download URL from HuggingFace page
                     # Pattern: https://huggingface.co/{repo}/blob/main/{file}
-                    hf_pattern = r'huggingface\.co/([^/]+/[^/]+)(?:/(?:blob|tree)/[^/]+)?'
-                    match = re.search(hf_pattern, result_url)
+                    match = HF_REPO_RE.search(result_url)
                     if match:
                         repo = match.group(1)
                         # Check if filename is mentioned in content or title
-                        if filename.lower() in content or filename_base.lower() in content:
+                        if filename_lower in content or filename_base_lower in content:
                             # Try to find the file in this repo
                             try:
                                 files_url = f"https://huggingface.co/api/models/{repo}/tree/main"
-                                files_response = requests.get(files_url, timeout=10)
+                                files_response = http_session.get(files_url, timeout=10)
                                 if files_response.status_code == 200:
                                     files = files_response.json()
                                     for file_info in files:
                                         file_path = file_info.get('path', '')
-                                        if file_path.endswith('.safetensors') or file_path.endswith('.ckpt'):
+                                        if file_path.endswith(('.safetensors', '.ckpt')):
                                             # Check if filename matches
-                                            if filename.lower() in file_path.lower() or filename_base.lower() in file_path.lower():
+                                            file_path_lower = file_path.lower()
+                                            if filename_lower in file_path_lower or filename_base_lower in file_path_lower:
                                                 download_url = f"https://huggingface.co/{repo}/resolve/main/{file_path}"
                                                 _url_search_cache[cache_key] = {
                                                     'url': download_url,
@@ -860,14 +1032,13 @@ def search_tavily_api(filename):
 
                 elif 'civitai.com' in result_url:
                     # Extract model ID from CivitAI URL
-                    civit_pattern = r'civitai\.com/models/(\d+)'
-                    match = re.search(civit_pattern, result_url)
+                    match = CIVITAI_MODEL_ID_RE.search(result_url)
                     if match:
                         model_id = match.group(1)
                         # Get model info from CivitAI API
                         try:
                             api_url = f"https://civitai.com/api/v1/models/{model_id}"
-                            api_response = requests.get(api_url, timeout=10)
+                            api_response = http_session.get(api_url, timeout=10)
                             if api_response.status_code == 200:
                                 model_data = api_response.json()
                                 model_versions = model_data.get('modelVersions', [])
@@ -875,7 +1046,8 @@ def search_tavily_api(filename):
                                     files = version.get('files', [])
                                     for file_info in files:
                                         file_name = file_info.get('name', '')
-                                        if filename.lower() in file_name.lower() or filename_base.lower() in file_name.lower():
+                                        file_name_lower = file_name.lower()
+                                        if filename_lower in file_name_lower or filename_base_lower in file_name_lower:
                                             download_url = file_info.get('downloadUrl', '')
                                             if download_url:
                                                 _url_search_cache[cache_key] = {
@@ -944,90 +1116,103 @@ def find_model_url(filename, search_apis=False):
 
 SUPPORTED_MODEL_EXTENSIONS = {'.ckpt', '.pt', '.pt2', '.bin', '.pth', '.safetensors', '.pkl', '.sft', '.gguf', '.onnx'}
 
+# folder_paths entries that are not model folders
+EXCLUDED_FOLDER_TYPES = {
+    'custom_nodes', 'configs', 'fonts', 'kjnodes_fonts', 'web', 'js',
+    'user', 'input', 'output', 'temp', 'models', 'pycache'
+}
+EXCLUDED_FOLDER_SUBSTRINGS = ('pycache', '_cache', 'config', 'font')
+
+
+def is_excluded_folder_type(folder_type):
+    """Check if a folder_paths type is a non-model folder"""
+    name = folder_type.lower()
+    return name in EXCLUDED_FOLDER_TYPES or any(x in name for x in EXCLUDED_FOLDER_SUBSTRINGS)
+
 # Filename patterns for model type detection
 # Patterns are checked in order - first match wins
 # This must match exactly with parse_workflow_models.py
 FILENAME_TYPE_PATTERNS = [
     # VAE Approximation (TAESD)
-    (r'tae[sf]\d*[_-]?(decoder|encoder)', 'TAESD', 'vae_approx'),
+    (re.compile(r'tae[sf]\d*[_-]?(decoder|encoder)'), 'TAESD', 'vae_approx'),
 
     # Latent upscalers (before generic upscale)
-    (r'latent.*upsampl|upsampl.*latent', 'Latent Upsampler', 'latent_upscale_models'),
+    (re.compile(r'latent.*upsampl|upsampl.*latent'), 'Latent Upsampler', 'latent_upscale_models'),
 
     # Text encoders (T5 variants)
-    (r't5[-_]?xxl|umt5|t5[-_]?xl|t5[-_]?base', 'Text Encoder (T5)', 'text_encoders'),
-    (r'long[-_]?clip', 'Long CLIP', 'text_encoders'),
+    (re.compile(r't5[-_]?xxl|umt5|t5[-_]?xl|t5[-_]?base'), 'Text Encoder (T5)', 'text_encoders'),
+    (re.compile(r'long[-_]?clip'), 'Long CLIP', 'text_encoders'),
 
     # CLIP Vision (before generic CLIP)
-    (r'clip.*vision|sigclip.*vision|vision.*clip', 'CLIP Vision', 'clip_vision'),
+    (re.compile(r'clip.*vision|sigclip.*vision|vision.*clip'), 'CLIP Vision', 'clip_vision'),
 
     # CLIP models
-    (r'^clip[-_]|clip[-_][lg]|openclip', 'CLIP', 'clip'),
+    (re.compile(r'^clip[-_]|clip[-_][lg]|openclip'), 'CLIP', 'clip'),
 
     # Flux specific
-    (r'^flux.*dev|flux.*schnell|^flux1|flux[-_]', 'Flux UNET', 'diffusion_models'),
-    (r'^ae\.safetensors$', 'VAE (Flux)', 'vae'),
+    (re.compile(r'^flux.*dev|flux.*schnell|^flux1|flux[-_]'), 'Flux UNET', 'diffusion_models'),
+    (re.compile(r'^ae\.safetensors$'), 'VAE (Flux)', 'vae'),
 
     # VAE (check before video models since video models can have _vae suffix)
-    (r'_vae_|_vae\.|^vae[-_]|[-_]vae\.|vae[-_]?fp', 'VAE', 'vae'),
+    (re.compile(r'_vae_|_vae\.|^vae[-_]|[-_]vae\.|vae[-_]?fp'), 'VAE', 'vae'),
 
     # LoRA (check BEFORE video models - distill_lora, refinement_lora, etc. are LoRAs even with video model names)
-    (r'lora|locon|dora', 'LoRA', 'loras'),
+    (re.compile(r'lora|locon|dora'), 'LoRA', 'loras'),
 
     # Video/Diffusion models (check patterns from VIDEO_MODEL_PATTERNS)
-    (r'hunyuan|longcat|wanvideo|wan_|cosmos|cogvideo|mochi|ltxv|ltx[-_]?video', 'Video Diffusion Model', 'diffusion_models'),
-    (r'framepack|stable[-_]?cascade|cascade[-_]', 'Video/Image Diffusion Model', 'diffusion_models'),
-    (r'dynamicrafter|tooncrafter|animate', 'Animation Model', 'diffusion_models'),
-    (r'svd|video[-_]?diffusion|i2v|t2v|ti2v', 'Video Diffusion Model', 'diffusion_models'),
+    (re.compile(r'hunyuan|longcat|wanvideo|wan_|cosmos|cogvideo|mochi|ltxv|ltx[-_]?video'), 'Video Diffusion Model', 'diffusion_models'),
+    (re.compile(r'framepack|stable[-_]?cascade|cascade[-_]'), 'Video/Image Diffusion Model', 'diffusion_models'),
+    (re.compile(r'dynamicrafter|tooncrafter|animate'), 'Animation Model', 'diffusion_models'),
+    (re.compile(r'svd|video[-_]?diffusion|i2v|t2v|ti2v'), 'Video Diffusion Model', 'diffusion_models'),
 
     # ControlNet and adapters
-    (r'controlnet|control[-_]?net|cn[-_]', 'ControlNet', 'controlnet'),
-    (r't2i[-_]?adapter|adapter[-_]?t2i', 'T2I-Adapter', 'controlnet'),
-    (r'ipadapter|ip[-_]?adapter', 'IP-Adapter', 'ipadapter'),
+    (re.compile(r'controlnet|control[-_]?net|cn[-_]'), 'ControlNet', 'controlnet'),
+    (re.compile(r't2i[-_]?adapter|adapter[-_]?t2i'), 'T2I-Adapter', 'controlnet'),
+    (re.compile(r'ipadapter|ip[-_]?adapter'), 'IP-Adapter', 'ipadapter'),
 
     # Face/Identity models
-    (r'instantid', 'InstantID', 'instantid'),
-    (r'pulid', 'PuLID', 'pulid'),
-    (r'photomaker', 'PhotoMaker', 'photomaker'),
-    (r'insightface|antelopev2|buffalo', 'InsightFace', 'insightface/models'),
-    (r'gfpgan|codeformer|facerestorer', 'Face Restore', 'facerestore_models'),
+    (re.compile(r'instantid'), 'InstantID', 'instantid'),
+    (re.compile(r'pulid'), 'PuLID', 'pulid'),
+    (re.compile(r'photomaker'), 'PhotoMaker', 'photomaker'),
+    (re.compile(r'insightface|antelopev2|buffalo'), 'InsightFace', 'insightface/models'),
+    (re.compile(r'gfpgan|codeformer|facerestorer'), 'Face Restore', 'facerestore_models'),
 
     # Segmentation models
-    (r'sam[-_]?2\.1|sam2\.1', 'SAM 2.1', 'sams'),
-    (r'sam[-_]?2|sam2', 'SAM 2', 'sams'),
-    (r'^sam[-_]|segment[-_]?anything', 'SAM', 'sams'),
-    (r'grounding[-_]?dino', 'GroundingDINO', 'groundingdino'),
-    (r'yolo|ultralytics', 'Ultralytics', 'ultralytics'),
+    (re.compile(r'sam[-_]?2\.1|sam2\.1'), 'SAM 2.1', 'sams'),
+    (re.compile(r'sam[-_]?2|sam2'), 'SAM 2', 'sams'),
+    (re.compile(r'^sam[-_]|segment[-_]?anything'), 'SAM', 'sams'),
+    (re.compile(r'grounding[-_]?dino'), 'GroundingDINO', 'groundingdino'),
+    (re.compile(r'yolo|ultralytics'), 'Ultralytics', 'ultralytics'),
 
     # VAE
-    (r'vae|variational', 'VAE', 'vae'),
+    (re.compile(r'vae|variational'), 'VAE', 'vae'),
 
     # Upscalers
-    (r'esrgan|realesrgan|swinir|upscale|4x[-_]|2x[-_]|rgt', 'Upscaler', 'upscale_models'),
+    (re.compile(r'esrgan|realesrgan|swinir|upscale|4x[-_]|2x[-_]|rgt'), 'Upscaler', 'upscale_models'),
 
     # AnimateDiff
-    (r'animatediff|motion[-_]?module|mm[-_]?', 'AnimateDiff', 'animatediff_models'),
-    (r'motion[-_]?lora', 'Motion LoRA', 'animatediff_motion_lora'),
+    (re.compile(r'animatediff|motion[-_]?module|mm[-_]?'), 'AnimateDiff', 'animatediff_models'),
+    (re.compile(r'motion[-_]?lora'), 'Motion LoRA', 'animatediff_motion_lora'),
 
     # Depth models
-    (r'depth[-_]?anything|depthanything', 'Depth Anything', 'depthanything'),
-    (r'depth[-_]?pro|ml[-_]?depth', 'Depth Pro', 'depth/ml-depth-pro'),
+    (re.compile(r'depth[-_]?anything|depthanything'), 'Depth Anything', 'depthanything'),
+    (re.compile(r'depth[-_]?pro|ml[-_]?depth'), 'Depth Pro', 'depth/ml-depth-pro'),
 
     # Embeddings
-    (r'embedding|textual[-_]?inversion', 'Embedding', 'embeddings'),
+    (re.compile(r'embedding|textual[-_]?inversion'), 'Embedding', 'embeddings'),
 
     # SDXL checkpoints
-    (r'sdxl|sd[-_]?xl|xl[-_]turbo', 'Checkpoint (SDXL)', 'checkpoints'),
+    (re.compile(r'sdxl|sd[-_]?xl|xl[-_]turbo'), 'Checkpoint (SDXL)', 'checkpoints'),
 
     # SD 1.5/2.x checkpoints
-    (r'sd[-_]?1\.?5|sd15|v1[-_]?5', 'Checkpoint (SD1.5)', 'checkpoints'),
-    (r'sd[-_]?2\.?1|sd21|v2[-_]?1', 'Checkpoint (SD2.1)', 'checkpoints'),
+    (re.compile(r'sd[-_]?1\.?5|sd15|v1[-_]?5'), 'Checkpoint (SD1.5)', 'checkpoints'),
+    (re.compile(r'sd[-_]?2\.?1|sd21|v2[-_]?1'), 'Checkpoint (SD2.1)', 'checkpoints'),
 
     # SD3
-    (r'sd[-_]?3|sd3', 'Checkpoint (SD3)', 'checkpoints'),
+    (re.compile(r'sd[-_]?3|sd3'), 'Checkpoint (SD3)', 'checkpoints'),
 
     # Inpainting
-    (r'inpaint', 'Inpaint Model', 'checkpoints'),
+    (re.compile(r'inpaint'), 'Inpaint Model', 'checkpoints'),
 ]
 
 # URL path to directory mapping
@@ -1063,8 +1248,9 @@ URL_DIRECTORY_HINTS = {
 }
 
 
+@lru_cache(maxsize=4096)
 def identify_model_type_from_filename(model_name):
-    """Identify model type from filename patterns"""
+    """Identify model type from filename patterns (cached; model-list.json is loaded once)"""
     model_lower = model_name.lower()
 
     # Skip GGUF/LLM files
@@ -1078,7 +1264,7 @@ def identify_model_type_from_filename(model_name):
 
     # Check against filename patterns
     for pattern, model_type, directory in FILENAME_TYPE_PATTERNS:
-        if re.search(pattern, model_lower):
+        if pattern.search(model_lower):
             return model_type, directory
 
     # Default fallback by extension
@@ -1093,16 +1279,51 @@ def identify_model_type_from_filename(model_name):
         return None, None
 
 
+# Files above this size are hashed with a reader thread so disk reads overlap hashing;
+# smaller files use hashlib.file_digest (Python 3.11+) or a plain read loop
+HASH_READAHEAD_THRESHOLD = 256 * 1024 * 1024
+HASH_READAHEAD_DEPTH = 4
+HASH_READ_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _hash_with_readahead(f, hash_obj):
+    """Feed hash_obj from a reader thread through a bounded queue of HASH_READ_CHUNK_SIZE chunks"""
+    chunks = queue.Queue(maxsize=HASH_READAHEAD_DEPTH)
+
+    def reader():
+        try:
+            while chunk := f.read(HASH_READ_CHUNK_SIZE):
+                chunks.put(chunk)
+            chunks.put(None)
+        except Exception as e:
+            chunks.put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    while (chunk := chunks.get()) is not None:
+        if isinstance(chunk, Exception):
+            raise chunk
+        hash_obj.update(chunk)
+    thread.join()
+
+
 def calculate_file_hash(filepath, algorithm='sha256'):
-    """Calculate SHA256 hash of a file (first 10MB for speed)"""
-    import hashlib
+    """Calculate the full-file hash (CivitAI looks models up by full SHA256)"""
     hash_obj = hashlib.new(algorithm)
 
     try:
         with open(filepath, 'rb') as f:
-            # Read first 10MB for quick hash (CivitAI uses full file hash though)
-            # For accurate lookup, we need the full hash
-            while chunk := f.read(8192 * 1024):  # 8MB chunks
+            # One sequential pass: ask the kernel for aggressive readahead where supported
+            if hasattr(os, 'posix_fadvise'):
+                with contextlib.suppress(OSError):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if os.fstat(f.fileno()).st_size > HASH_READAHEAD_THRESHOLD:
+                _hash_with_readahead(f, hash_obj)
+                return hash_obj.hexdigest()
+            # Up to the threshold, Python 3.11+: native readinto loop over a reused buffer
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            while chunk := f.read(HASH_READ_CHUNK_SIZE):
                 hash_obj.update(chunk)
         return hash_obj.hexdigest()
     except Exception as e:
@@ -1110,6 +1331,38 @@ def calculate_file_hash(filepath, algorithm='sha256'):
         return None
 
 
+def file_hash_fields(filepath, sha256):
+    """Metadata fields recording a file's SHA256 and the size/mtime it was computed at"""
+    stat = os.stat(filepath)
+    return {'sha256': sha256, 'sha256_size': stat.st_size, 'sha256_mtime': stat.st_mtime}
+
+
+def cached_hash_fields(entry, stat):
+    """The SHA256 fields of a metadata entry if they still match the file's size/mtime, else {}"""
+    if entry.get('sha256') and entry.get('sha256_size') == stat.st_size and entry.get('sha256_mtime') == stat.st_mtime:
+        return {key: entry[key] for key in ('sha256', 'sha256_size', 'sha256_mtime')}
+    return {}
+
+
+def get_file_sha256(filepath, filename=None):
+    """SHA256 of a model file, reusing the hash in model_metadata.json while size/mtime still match"""
+    basename = os.path.basename(filepath)
+    entry = get_cached_metadata(filename or basename) or {}
+    if entry.get('sha256'):
+        try:
+            cached = cached_hash_fields(entry, os.stat(filepath))
+        except OSError:
+            return None
+        if cached:
+            return cached['sha256']
+
+    file_hash = calculate_file_hash(filepath)
+    if file_hash:
+        with contextlib.suppress(OSError):
+            save_search_metadata(basename, file_hash_fields(filepath, file_hash))
+    return file_hash
+
+
 def lookup_civitai_by_hash(file_hash):
     """Look up model on CivitAI by SHA256 hash"""
     if not file_hash:
@@ -1117,7 +1370,7 @@ def lookup_civitai_by_hash(file_hash):
 
     try:
         url = f"https://civitai.com/api/v1/model-versions/by-hash/{file_hash}"
-        response = requests.get(url, timeout=15)
+        response = http_session.get(url, timeout=15)
 
         if response.status_code == 200:
             data = response.json()
@@ -1177,11 +1430,26 @@ def find_model_file_path(target_dir, filename):
                 return model_path
 
             # Search subdirectories
-            if os.path.exists(base_path):
-                for root, dirs, files in os.walk(base_path):
-                    if filename in files:
-                        return os.path.join(root, filename)
+            found = _find_file_in_tree(base_path, filename)
+            if found:
+                return found
+
+    return None
 
+
+def _find_file_in_tree(base_path, filename):
+    """Depth-first scandir search for a file name, stopping at the first match"""
+    stack = [base_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name == filename and not entry.is_dir():
+                        return entry.path
+        except OSError:
+            continue
     return None
 
 
@@ -1194,8 +1462,7 @@ def extract_huggingface_info(url):
     url = url.split(')')[0].replace('\\n', '').replace('\n', '').strip()
 
     # Pattern: https://huggingface.co/{repo}/resolve/{branch}/{path/to/file}
-    pattern = r'huggingface\.co/([^/]+/[^/]+)/(?:resolve|blob)/[^/]+/(.+?)(?:\?|$)'
-    match = re.search(pattern, url)
+    match = HF_FILE_URL_RE.search(url)
 
     if match:
         repo = match.group(1)
@@ -1216,16 +1483,29 @@ EQUIVALENT_DIRECTORIES = {
 # Model format alternatives - used to find compatible alternatives
 MODEL_FORMAT_PATTERNS = [
     # (pattern_to_match, alternative_suffixes_to_try)
-    (r'(.+?)[-_]?fp32\.safetensors$', ['fp16', 'bf16', 'fp8', 'fp8_e4m3fn', 'gguf']),
-    (r'(.+?)[-_]?fp16\.safetensors$', ['fp32', 'bf16', 'fp8', 'fp8_e4m3fn', 'gguf']),
-    (r'(.+?)[-_]?bf16\.safetensors$', ['fp16', 'fp32', 'fp8', 'fp8_e4m3fn', 'gguf']),
-    (r'(.+?)[-_]?fp8[-_]?e4m3fn\.safetensors$', ['fp16', 'bf16', 'fp8', 'fp32']),
-    (r'(.+?)[-_]?fp8\.safetensors$', ['fp16', 'bf16', 'fp8_e4m3fn', 'fp32']),
-    (r'(.+?)\.gguf$', ['safetensors', 'fp16.safetensors', 'bf16.safetensors']),
-    (r'(.+?)[-_]?Q\d+.*\.gguf$', ['safetensors', 'fp16.safetensors', 'gguf']),
-    (r'(.+?)\.safetensors$', ['fp16.safetensors', 'bf16.safetensors', 'fp8.safetensors', 'gguf']),
+    (re.compile(r'(.+?)[-_]?fp32\.safetensors$'), ['fp16', 'bf16', 'fp8', 'fp8_e4m3fn', 'gguf']),
+    (re.compile(r'(.+?)[-_]?fp16\.safetensors$'), ['fp32', 'bf16', 'fp8', 'fp8_e4m3fn', 'gguf']),
+    (re.compile(r'(.+?)[-_]?bf16\.safetensors$'), ['fp16', 'fp32', 'fp8', 'fp8_e4m3fn', 'gguf']),
+    (re.compile(r'(.+?)[-_]?fp8[-_]?e4m3fn\.safetensors$'), ['fp16', 'bf16', 'fp8', 'fp32']),
+    (re.compile(r'(.+?)[-_]?fp8\.safetensors$'), ['fp16', 'bf16', 'fp8_e4m3fn', 'fp32']),
+    (re.compile(r'(.+?)\.gguf$'), ['safetensors', 'fp16.safetensors', 'bf16.safetensors']),
+    (re.compile(r'(.+?)[-_]?Q\d+.*\.gguf$'), ['safetensors', 'fp16.safetensors', 'gguf']),
+    (re.compile(r'(.+?)\.safetensors$'), ['fp16.safetensors', 'bf16.safetensors', 'fp8.safetensors', 'gguf']),
 ]
 
+# Precision suffixes stripped from base names when comparing alternatives
+# (the requested file's fallback base name never strips _fp8_e4m3fn)
+BASE_PRECISION_SUFFIX_RE = re.compile(r'[-_](?:fp16|fp32|bf16|fp8)$')
+PRECISION_SUFFIX_RE = re.compile(r'(?:[-_](?:fp16|fp32|bf16|fp8)|_fp8_e4m3fn)$')
+
+
+def format_model_size(size_bytes):
+    """Format a model size as MB, or GB from 1024 MB up"""
+    size_mb = size_bytes / (1024 * 1024)
+    if size_mb >= 1024:
+        return f"{size_mb/1024:.2f} GB"
+    return f"{size_mb:.1f} MB"
+
 
 def find_model_alternatives(filename, target_dir):
     """Find alternative versions of a model (different quantizations/formats)"""
@@ -1235,19 +1515,14 @@ def find_model_alternatives(filename, target_dir):
 
     # Try to extract base name from filename
     for pattern, alt_suffixes in MODEL_FORMAT_PATTERNS:
-        match = re.match(pattern, filename_lower)
+        match = pattern.match(filename_lower)
         if match:
             base_name = match.group(1)
             break
 
     if not base_name:
         # Try simple extension removal
-        base_name = os.path.splitext(filename_lower)[0]
-        # Remove common suffixes
-        for suffix in ['_fp16', '_fp32', '_bf16', '_fp8', '-fp16', '-fp32', '-bf16', '-fp8']:
-            if base_name.endswith(suffix):
-                base_name = base_name[:-len(suffix)]
-                break
+        base_name = BASE_PRECISION_SUFFIX_RE.sub('', os.path.splitext(filename_lower)[0])
 
     # Get list of directories to check
     dirs_to_check = [target_dir]
@@ -1260,13 +1535,8 @@ def find_model_alternatives(filename, target_dir):
 
             for available_file in available_files:
                 available_lower = available_file.lower()
-                available_base = os.path.splitext(os.path.basename(available_lower))[0]
-
                 # Remove common suffixes for comparison
-                for suffix in ['_fp16', '_fp32', '_bf16', '_fp8', '-fp16', '-fp32', '-bf16', '-fp8', '_fp8_e4m3fn']:
-                    if available_base.endswith(suffix):
-                        available_base = available_base[:-len(suffix)]
-                        break
+                available_base = PRECISION_SUFFIX_RE.sub('', os.path.splitext(os.path.basename(available_lower))[0])
 
                 # Check if this could be an alternative
                 if available_file.lower() != filename_lower:
@@ -1275,14 +1545,9 @@ def find_model_alternatives(filename, target_dir):
                         # Get full path and size
                         full_path = folder_paths.get_full_path(check_dir, available_file)
                         size_str = None
-                        if full_path and os.path.exists(full_path):
+                        if full_path:
                             try:
-                                size_bytes = os.path.getsize(full_path)
-                                size_mb = size_bytes / (1024 * 1024)
-                                if size_mb >= 1024:
-                                    size_str = f"{size_mb/1024:.2f} GB"
-                                else:
-                                    size_str = f"{size_mb:.1f} MB"
+                                size_str = format_model_size(os.path.getsize(full_path))
                             except Exception:
                                 pass
 
@@ -1368,16 +1633,15 @@ def check_model_exists(target_dir, filename):
                 if fname in available_files:
                     # Found it - get the full path to check size
                     full_path = folder_paths.get_full_path(check_dir, fname)
-                    if full_path and os.path.exists(full_path):
+                    if full_path:
+                        # One stat call both confirms the file and gives its size
                         try:
                             size_bytes = os.path.getsize(full_path)
-                            size_mb = size_bytes / (1024 * 1024)
-                            if size_mb >= 1024:
-                                return True, f"{size_mb/1024:.2f} GB"
-                            else:
-                                return True, f"{size_mb:.1f} MB"
+                        except FileNotFoundError:
+                            continue
                         except Exception:
                             return True, None
+                        return True, format_model_size(size_bytes)
         except Exception as e:
             # Fallback: folder type might not exist in ComfyUI
             logging.debug(f"[WMD] Could not check {check_dir}: {e}")
@@ -1390,30 +1654,37 @@ def check_model_exists(target_dir, filename):
         else:
             direct_path = os.path.join(folder_paths.models_dir, folder_type, filename)
 
-        if os.path.exists(direct_path):
-            size_bytes = os.path.getsize(direct_path)
-            size_mb = size_bytes / (1024 * 1024)
-            if size_mb >= 1024:
-                return True, f"{size_mb/1024:.2f} GB"
-            else:
-                return True, f"{size_mb:.1f} MB"
+        return True, format_model_size(os.path.getsize(direct_path))
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logging.debug(f"[WMD] Direct path check failed: {e}")
 
     return False, None
 
 
-def scan_workflow_for_models(workflow_json):
+# Widget values treated as model references when scanning workflows / tracking usage
+WORKFLOW_WIDGET_MODEL_EXTENSIONS = ('.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.onnx')
+USAGE_MODEL_EXTENSIONS = ('.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.gguf')
+
+# Fallback patterns for model filenames and download URLs embedded in workflow text
+WORKFLOW_MODEL_FILE_RE = re.compile(r'([\w\-\.%]+\.(?:safetensors|ckpt|pt|pth|bin|onnx))')
+WORKFLOW_MODEL_URL_RE = re.compile(r'(https?://(?:huggingface\.co|civitai\.com|github\.com)[^\s"\'<>\)]+)')
+
+
+def scan_workflow_for_models(workflow_json, content=None):
     """Scan workflow JSON for model references"""
     if isinstance(workflow_json, str):
         try:
-            workflow_data = json.loads(workflow_json)
+            workflow_data = _json_loads_lenient(workflow_json)
         except Exception:
             workflow_data = {}
         content = workflow_json
     else:
         workflow_data = workflow_json
-        content = json.dumps(workflow_json)
+        # Callers that already hold the raw file text pass it to avoid re-serializing
+        if content is None:
+            content = json.dumps(workflow_json)
 
     # Skip if not a dict (e.g., index files that are lists)
     if not isinstance(workflow_data, dict):
@@ -1457,10 +1728,8 @@ def scan_workflow_for_models(workflow_json):
         widgets_values = node.get('widgets_values', [])
 
         for value in widgets_values:
-            if isinstance(value, str) and any(value.endswith(ext) for ext in ['.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.onnx']):
-                # Skip GGUF
-                if value.lower().endswith('.gguf'):
-                    continue
+            # GGUF files never match these extensions, so no separate skip is needed
+            if isinstance(value, str) and value.endswith(WORKFLOW_WIDGET_MODEL_EXTENSIONS):
                 if value not in node_models:
                     node_models[value] = {
                         'url': '',
@@ -1469,8 +1738,7 @@ def scan_workflow_for_models(workflow_json):
                     }
 
     # Find model filenames via regex (fallback for markdown notes, etc.)
-    model_pattern = r'([\w\-\.%]+\.(?:safetensors|ckpt|pt|pth|bin|onnx))'
-    model_files_raw = re.findall(model_pattern, content)
+    model_files_raw = WORKFLOW_MODEL_FILE_RE.findall(content)
 
     # Clean and deduplicate, decode URL-encoded names
     model_files = set()
@@ -1497,8 +1765,7 @@ def scan_workflow_for_models(workflow_json):
                 model_name_map[decoded] = cleaned  # Keep original for URL matching
 
     # Find download URLs via regex
-    url_pattern = r'(https?://(?:huggingface\.co|civitai\.com|github\.com)[^\s"\'<>\)]+)'
-    urls = re.findall(url_pattern, content)
+    urls = WORKFLOW_MODEL_URL_RE.findall(content)
 
     # Clean URLs
     cleaned_urls = []
@@ -1539,6 +1806,7 @@ def scan_workflow_for_models(workflow_json):
 
     # Build results
     models_data = []
+    metadata_updates = []
     for model in sorted(model_files):
         url = model_url_map.get(model, '')
 
@@ -1631,15 +1899,17 @@ def scan_workflow_for_models(workflow_json):
 
         # Save URL to model_metadata.json if found (so Local Browser can see it)
         if url and not cached_metadata:
-            save_search_metadata(model, {
+            metadata_updates.append((model, {
                 'url': url,
                 'source': url_source or ('workflow' if url else None),
                 'hf_repo': hf_repo or '',
                 'hf_path': hf_path or '',
                 'model_type': model_type,
                 'directory': target_dir
-            })
+            }))
 
+    # One model_metadata.json write per scan rather than one per model
+    save_search_metadata_batch(metadata_updates)
     return models_data
 
 
@@ -1651,7 +1921,7 @@ def scan_workflow_for_models(workflow_json):
 async def scan_workflow(request):
     """Scan the provided workflow JSON for models"""
     try:
-        data = await request.json()
+        data = await request.json(loads=_json_loads_lenient)
         workflow = data.get('workflow', {})
 
         if not workflow:
@@ -1674,7 +1944,7 @@ async def scan_workflow(request):
                 'missing': missing,
                 'hf_downloadable': len([m for m in hf_models if not m['exists']])
             }
-        })
+        }, dumps=_json_dumps)
     except Exception as e:
         logging.error(f"[Workflow-Models-Downloader] Scan error: {e}")
         return web.json_response({'error': str(e)}, status=500)
@@ -1695,18 +1965,10 @@ async def get_available_directories(request):
             'llm_gguf', 'CogVideo', 'blip'
         ])
 
-        # Folders to exclude (not model folders)
-        EXCLUDED_FOLDERS = {
-            'custom_nodes', 'configs', 'fonts', 'kjnodes_fonts', 'web', 'js',
-            'user', 'input', 'output', 'temp', 'models', 'pycache'
-        }
-
         # Add custom folder types, excluding non-model folders
         if hasattr(folder_paths, 'folder_names_and_paths'):
             for folder_type in folder_paths.folder_names_and_paths.keys():
-                if folder_type.lower() in EXCLUDED_FOLDERS:
-                    continue
-                if any(x in folder_type.lower() for x in ['pycache', '_cache', 'config', 'font']):
+                if is_excluded_folder_type(folder_type):
                     continue
                 all_types.add(folder_type)
 
@@ -1782,10 +2044,11 @@ def load_usage_cache():
     try:
         if os.path.exists(USAGE_CACHE_FILE):
             with open(USAGE_CACHE_FILE, 'r', encoding='utf-8') as f:
-                used_models_tracking = json.load(f)
+                used_models_tracking = _json_loads_lenient(f.read())
             logging.info(f"[WMD] Loaded usage cache with {len(used_models_tracking)} models")
     except Exception as e:
         logging.error(f"[WMD] Error loading usage cache: {e}")
+        set_aside_unreadable(USAGE_CACHE_FILE)
         used_models_tracking = {}
 
 
@@ -1793,15 +2056,47 @@ def save_usage_cache():
     """Save usage tracking to persistent cache"""
     global used_models_tracking
     try:
-        with open(USAGE_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(used_models_tracking, f, indent=2)
-        logging.info(f"[WMD] Saved usage cache with {len(used_models_tracking)} models")
+        # Serialize in one call so a concurrent update can't interleave with the write
+        write_text_atomic(USAGE_CACHE_FILE, _json_dumps(used_models_tracking))
+        logging.debug(f"[WMD] Saved usage cache with {len(used_models_tracking)} models")
     except Exception as e:
         logging.error(f"[WMD] Error saving usage cache: {e}")
 
 
-# Load cache on module import
+# Debounced usage cache writes: bursts of tracking updates collapse into one save
+USAGE_CACHE_SAVE_DELAY = 2.0  # seconds
+_usage_cache_save_timer = None
+_usage_cache_save_lock = threading.Lock()
+
+
+def schedule_usage_cache_save():
+    """Save the usage cache after a short delay, coalescing repeated requests"""
+    global _usage_cache_save_timer
+    with _usage_cache_save_lock:
+        if _usage_cache_save_timer is not None:
+            return  # The pending save will include this update
+        _usage_cache_save_timer = threading.Timer(USAGE_CACHE_SAVE_DELAY, flush_usage_cache)
+        _usage_cache_save_timer.daemon = True
+        _usage_cache_save_timer.start()
+
+
+def flush_usage_cache():
+    """Write a pending debounced usage cache save immediately"""
+    global _usage_cache_save_timer
+    with _usage_cache_save_lock:
+        if _usage_cache_save_timer is None:
+            return
+        _usage_cache_save_timer.cancel()
+        _usage_cache_save_timer = None
+    save_usage_cache()
+
+
+atexit.register(flush_usage_cache)
+
+
+# Load caches on module import
 load_usage_cache()
+load_download_history()
 
 # Initialize max_parallel_downloads from settings
 def _init_parallel_downloads():
@@ -1829,9 +2124,7 @@ def extract_models_from_workflow(workflow_data):
             widgets = node.get('widgets_values', [])
             if widgets:
                 for val in widgets:
-                    if isinstance(val, str) and (val.endswith('.safetensors') or val.endswith('.ckpt') or
-                                                   val.endswith('.pt') or val.endswith('.pth') or
-                                                   val.endswith('.bin') or val.endswith('.gguf')):
+                    if isinstance(val, str) and val.endswith(USAGE_MODEL_EXTENSIONS):
                         models.add(val)
 
     # Handle both graph format and API format
@@ -1850,6 +2143,20 @@ def extract_models_from_workflow(workflow_data):
     return models
 
 
+def record_model_usage(filename, workflow_name, timestamp):
+    """Mark a model as used by a workflow in used_models_tracking"""
+    entry = used_models_tracking.get(filename)
+    if not isinstance(entry, dict):
+        # New model, or an old-format entry that only stored a timestamp
+        entry = used_models_tracking[filename] = {'last_used': timestamp, 'workflows': []}
+    entry['last_used'] = timestamp
+
+    workflows = entry.setdefault('workflows', [])
+    if workflow_name and workflow_name not in workflows:
+        workflows.append(workflow_name)
+        del workflows[:-10]  # Keep last 10
+
+
 @routes.post("/workflow-models/track-usage")
 async def track_model_usage(request):
     """Track which models are used in the current workflow"""
@@ -1864,19 +2171,10 @@ async def track_model_usage(request):
         for model in models:
             filename = model.get('filename', '')
             if filename:
-                if filename not in used_models_tracking:
-                    used_models_tracking[filename] = {'last_used': timestamp, 'workflows': []}
-                else:
-                    used_models_tracking[filename]['last_used'] = timestamp
-
-                # Add workflow to list if not already there
-                workflows = used_models_tracking[filename].get('workflows', [])
-                if workflow_name and workflow_name not in workflows:
-                    workflows.append(workflow_name)
-                    used_models_tracking[filename]['workflows'] = workflows[-10:]  # Keep last 10
+                record_model_usage(filename, workflow_name, timestamp)
 
         # Save to persistent cache
-        save_usage_cache()
+        schedule_usage_cache_save()
 
         return web.json_response({'success': True, 'tracked': len(models)})
     except Exception as e:
@@ -1903,15 +2201,10 @@ async def get_unused_models(request):
                     size_str = None
                     modified_time = None
 
-                    if full_path and os.path.exists(full_path):
+                    if full_path:
                         try:
                             stat = os.stat(full_path)
-                            size_bytes = stat.st_size
-                            size_mb = size_bytes / (1024 * 1024)
-                            if size_mb >= 1024:
-                                size_str = f"{size_mb/1024:.2f} GB"
-                            else:
-                                size_str = f"{size_mb:.1f} MB"
+                            size_str = format_model_size(stat.st_size)
                             modified_time = stat.st_mtime
                         except Exception:
                             pass
@@ -1993,8 +2286,8 @@ async def scan_all_workflows(request):
 
         for filepath in json_files:
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    workflow_data = json.load(f)
+                with open(filepath, 'rb') as f:
+                    workflow_data = _json_loads_lenient(f.read())
 
                 # Extract models from workflow
                 workflow_models = extract_models_from_workflow(workflow_data)
@@ -2002,14 +2295,7 @@ async def scan_all_workflows(request):
 
                 for model in workflow_models:
                     models_found.add(model)
-                    if model not in used_models_tracking:
-                        used_models_tracking[model] = {'last_used': timestamp, 'workflows': []}
-
-                    workflows = used_models_tracking[model].get('workflows', [])
-                    if workflow_name not in workflows:
-                        workflows.append(workflow_name)
-                        used_models_tracking[model]['workflows'] = workflows[-10:]  # Keep last 10
-                    used_models_tracking[model]['last_used'] = timestamp
+                    record_model_usage(model, workflow_name, timestamp)
 
                 scanned += 1
             except Exception as e:
@@ -2017,7 +2303,7 @@ async def scan_all_workflows(request):
                 errors += 1
 
         # Save to persistent cache
-        save_usage_cache()
+        schedule_usage_cache_save()
 
         return web.json_response({
             'success': True,
@@ -2214,7 +2500,7 @@ async def parse_workflow(request):
             workflow_content = f.read()
 
         try:
-            workflow_data = json.loads(workflow_content)
+            workflow_data = _json_loads_lenient(workflow_content)
         except Exception:
             return web.json_response({'error': 'Invalid JSON in workflow file'}, status=400)
 
@@ -2222,7 +2508,7 @@ async def parse_workflow(request):
 
         # Use the same scan_workflow_for_models function as the main Workflow Models tab
         # This already returns all the data we need including existence check, URLs, and alternatives
-        scanned_models = scan_workflow_for_models(workflow_content)
+        scanned_models = scan_workflow_for_models(workflow_data, content=workflow_content)
 
         # Map node_type to node_class for consistency with frontend
         models = []
@@ -2445,13 +2731,13 @@ async def fetch_download_url_from_page(url, filename):
                 # For CivitAI model pages, try to find download link
                 if 'civitai.com' in url:
                     # Look for model version ID
-                    version_match = re.search(r'modelVersionId[=:](\d+)', html)
+                    version_match = CIVITAI_VERSION_ID_RE.search(html)
                     if version_match:
                         version_id = version_match.group(1)
                         return f"https://civitai.com/api/download/models/{version_id}"
 
                     # Look for download button/link
-                    download_match = re.search(r'href="(/api/download/models/\d+[^"]*)"', html)
+                    download_match = CIVITAI_DOWNLOAD_HREF_RE.search(html)
                     if download_match:
                         return f"https://civitai.com{download_match.group(1)}"
 
@@ -2590,7 +2876,7 @@ async def extract_source_from_results(request):
         if 'huggingface.co' in url:
             # https://huggingface.co/owner/repo/resolve/main/path/to/file.safetensors
             # https://huggingface.co/owner/repo/blob/main/path/to/file.safetensors
-            hf_match = re.search(r'huggingface\.co/([^/]+/[^/]+)(?:/(?:resolve|blob)/[^/]+)?(?:/(.+))?', url)
+            hf_match = HF_REPO_PATH_RE.search(url)
             if hf_match:
                 metadata['hf_repo'] = hf_match.group(1)
                 if hf_match.group(2):
@@ -2605,7 +2891,7 @@ async def extract_source_from_results(request):
 
         # Parse CivitAI URLs
         elif 'civitai.com' in url:
-            civit_match = re.search(r'civitai\.com/models/(\d+)', url)
+            civit_match = CIVITAI_MODEL_ID_RE.search(url)
             if civit_match:
                 metadata['civitai_model_id'] = civit_match.group(1)
                 metadata['civitai_url'] = url
@@ -2651,7 +2937,7 @@ async def save_model_source(request):
 
         # Parse HuggingFace URLs
         if 'huggingface.co' in url:
-            hf_match = re.search(r'huggingface\.co/([^/]+/[^/]+)(?:/(?:resolve|blob)/[^/]+)?(?:/(.+))?', url)
+            hf_match = HF_REPO_PATH_RE.search(url)
             if hf_match:
                 metadata['hf_repo'] = hf_match.group(1)
                 if hf_match.group(2):
@@ -2662,7 +2948,7 @@ async def save_model_source(request):
 
         # Parse CivitAI URLs
         elif 'civitai.com' in url:
-            civit_match = re.search(r'civitai\.com/models/(\d+)', url)
+            civit_match = CIVITAI_MODEL_ID_RE.search(url)
             if civit_match:
                 metadata['civitai_model_id'] = civit_match.group(1)
                 metadata['civitai_url'] = url
@@ -2708,7 +2994,7 @@ async def get_tavily_cache_all(request):
     return web.json_response({
         'success': True,
         'cache': _tavily_cache
-    })
+    }, dumps=_json_dumps)
 
 
 @routes.get("/workflow-models/search-cache/{filename}")
@@ -2755,9 +3041,9 @@ async def lookup_by_hash(request):
                 'message': 'Model file not found locally'
             })
 
-        # Calculate hash (this may take time for large files)
+        # Calculate hash (this may take time for large files unless already recorded)
         logging.info(f"[Workflow-Models-Downloader] Calculating hash for: {filename}")
-        file_hash = calculate_file_hash(filepath)
+        file_hash = get_file_sha256(filepath, filename)
 
         if not file_hash:
             return web.json_response({
@@ -2903,18 +3189,22 @@ async def get_download_progress(request):
     """Get download progress for a specific download"""
     download_id = request.match_info['download_id']
 
+    # Copy under the lock, serialize after releasing it so download threads aren't blocked
     with download_lock:
-        if download_id in download_progress:
-            return web.json_response(download_progress[download_id])
-        else:
-            return web.json_response({'error': 'Download not found'}, status=404)
+        progress = download_progress.get(download_id)
+        snapshot = dict(progress) if progress is not None else None
+
+    if snapshot is None:
+        return web.json_response({'error': 'Download not found'}, status=404)
+    return web.json_response(snapshot)
 
 
 @routes.get("/workflow-models/progress")
 async def get_all_progress(request):
     """Get all download progress"""
     with download_lock:
-        return web.json_response(dict(download_progress))
+        snapshot = {k: dict(v) for k, v in download_progress.items()}
+    return web.json_response(snapshot, dumps=_json_dumps)
 
 
 @routes.post("/workflow-models/cancel/{download_id}")
@@ -2941,7 +3231,7 @@ async def get_download_history_endpoint(request):
     return web.json_response({
         'success': True,
         'history': download_history
-    })
+    }, dumps=_json_dumps)
 
 
 @routes.post("/workflow-models/clear-download-history")
@@ -2970,6 +3260,38 @@ async def delete_history_item_endpoint(request):
         return web.json_response({'error': str(e)}, status=500)
 
 
+def get_url_source(url):
+    """Classify a download URL as 'civitai', 'huggingface' or 'direct'"""
+    if 'civitai.com' in url:
+        return 'civitai'
+    if 'huggingface.co' in url:
+        return 'huggingface'
+    return 'direct'
+
+
+def set_download_progress(download_id, downloaded, total_size):
+    """Publish byte progress for a running download"""
+    with download_lock:
+        progress = download_progress.get(download_id)
+        if progress is None:
+            return
+        progress['downloaded'] = downloaded
+        progress['total_size'] = total_size
+        if total_size > 0:
+            progress['progress'] = int((downloaded / total_size) * 100)
+
+
+def iter_download_chunks(response, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Yield body chunks read directly from the urllib3 stream (no iter_content re-chunking)"""
+    # Partial reads keep cancel/pause checks and progress updates responsive on slow links
+    read = getattr(response.raw, 'read1', None)
+    if read is None:
+        read = response.raw.read
+        chunk_size = min(chunk_size, DOWNLOAD_BLOCKING_READ_SIZE)
+    while chunk := read(chunk_size, decode_content=True):
+        yield chunk
+
+
 def _download_model_thread(download_id, hf_repo, hf_path, filename, target_dir):
     """Background thread to download a model"""
     try:
@@ -2999,21 +3321,13 @@ def _download_model_thread(download_id, hf_repo, hf_path, filename, target_dir):
         # Get file size first
         try:
             url = f"https://huggingface.co/{hf_repo}/resolve/main/{hf_path}"
-            response = requests.head(url, allow_redirects=True, timeout=10, headers=headers)
+            response = download_session.head(url, allow_redirects=True, timeout=10, headers=headers)
             total_size = int(response.headers.get('content-length', 0))
             with download_lock:
                 download_progress[download_id]['total_size'] = total_size
         except Exception:
             total_size = 0
 
-        # Download with progress callback
-        def progress_callback(downloaded, total):
-            with download_lock:
-                download_progress[download_id]['downloaded'] = downloaded
-                download_progress[download_id]['total_size'] = total
-                if total > 0:
-                    download_progress[download_id]['progress'] = int((downloaded / total) * 100)
-
         # Use requests for download with progress
         url = f"https://huggingface.co/{hf_repo}/resolve/main/{hf_path}"
         # Normalize filename path separators and create subdirectories if needed
@@ -3024,15 +3338,18 @@ def _download_model_thread(download_id, hf_repo, hf_path, filename, target_dir):
         if dest_dir and not os.path.exists(dest_dir):
             os.makedirs(dest_dir, exist_ok=True)
 
-        response = requests.get(url, stream=True, timeout=30, headers=headers)
+        response = download_session.get(url, stream=True, timeout=30, headers=headers)
         response.raise_for_status()
 
         total_size = int(response.headers.get('content-length', 0))
         downloaded = 0
         cancelled = False
+        last_progress_update = 0
+        # Hash while streaming so hash lookups never have to re-read the file
+        hasher = hashlib.sha256()
 
         with open(dest_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=1024*1024):  # 1MB chunks for faster downloads
+            for chunk in iter_download_chunks(response):
                 # Check for cancellation
                 if download_id in cancelled_downloads:
                     logging.info(f"[Workflow-Models-Downloader] Download cancelled: {filename}")
@@ -3041,21 +3358,24 @@ def _download_model_thread(download_id, hf_repo, hf_path, filename, target_dir):
 
                 if chunk:
                     f.write(chunk)
+                    hasher.update(chunk)
                     downloaded += len(chunk)
-                    progress_callback(downloaded, total_size)
+                    now = time.monotonic()
+                    if now - last_progress_update >= PROGRESS_UPDATE_INTERVAL:
+                        last_progress_update = now
+                        set_download_progress(download_id, downloaded, total_size)
 
         # Handle cancellation after file is properly closed
         if cancelled:
-            try:
+            with contextlib.suppress(OSError):
                 os.remove(dest_file)
-            except OSError:
-                pass
             cancelled_downloads.discard(download_id)
             return
 
         with download_lock:
             download_progress[download_id]['status'] = 'completed'
             download_progress[download_id]['progress'] = 100
+            download_progress[download_id]['downloaded'] = downloaded
 
         # Save to model_metadata.json (single source of truth)
         hf_url = f"https://huggingface.co/{hf_repo}/resolve/main/{hf_path}"
@@ -3068,7 +3388,8 @@ def _download_model_thread(download_id, hf_repo, hf_path, filename, target_dir):
             'hf_repo': hf_repo,
             'hf_path': hf_path,
             'type': target_dir,
-            'downloaded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            'downloaded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **file_hash_fields(dest_file, hasher.hexdigest())
         }
         save_model_metadata(metadata)
 
@@ -3154,8 +3475,9 @@ def _download_from_url_thread(download_id, url, filename, target_dir):
             os.makedirs(dest_dir, exist_ok=True)
 
         # Prepare headers based on URL source
+        source = get_url_source(url)
         headers = {}
-        if 'civitai.com' in url:
+        if source == 'civitai':
             civitai_key = get_civitai_api_key()
             logging.info(f"[WMD] CivitAI download - key configured: {bool(civitai_key)}")
             if civitai_key:
@@ -3167,24 +3489,27 @@ def _download_from_url_thread(download_id, url, filename, target_dir):
                 logging.info(f"[WMD] CivitAI URL with token: {url[:80]}...")
             else:
                 logging.warning("[WMD] CivitAI download attempted without API key!")
-        elif 'huggingface.co' in url:
+        elif source == 'huggingface':
             hf_token = get_huggingface_token()
             if hf_token:
                 headers['Authorization'] = f'Bearer {hf_token}'
 
         # Download with progress
-        response = requests.get(url, stream=True, timeout=30, allow_redirects=True, headers=headers)
+        response = download_session.get(url, stream=True, timeout=30, allow_redirects=True, headers=headers)
         response.raise_for_status()
 
         total_size = int(response.headers.get('content-length', 0))
         downloaded = 0
         cancelled = False
+        last_progress_update = 0
+        # Hash while streaming so hash lookups never have to re-read the file
+        hasher = hashlib.sha256()
 
         with download_lock:
             download_progress[download_id]['total_size'] = total_size
 
         with open(dest_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=1024*1024):  # 1MB chunks for faster downloads
+            for chunk in iter_download_chunks(response):
                 # Check for cancellation
                 if download_id in cancelled_downloads:
                     logging.info(f"[Workflow-Models-Downloader] Download cancelled: {filename}")
@@ -3193,28 +3518,27 @@ def _download_from_url_thread(download_id, url, filename, target_dir):
 
                 if chunk:
                     f.write(chunk)
+                    hasher.update(chunk)
                     downloaded += len(chunk)
-                    with download_lock:
-                        download_progress[download_id]['downloaded'] = downloaded
-                        if total_size > 0:
-                            download_progress[download_id]['progress'] = int((downloaded / total_size) * 100)
+                    now = time.monotonic()
+                    if now - last_progress_update >= PROGRESS_UPDATE_INTERVAL:
+                        last_progress_update = now
+                        set_download_progress(download_id, downloaded, total_size)
 
         # Handle cancellation after file is properly closed
         if cancelled:
-            try:
+            with contextlib.suppress(OSError):
                 os.remove(dest_file)
-            except OSError:
-                pass
             cancelled_downloads.discard(download_id)
             return
 
         with download_lock:
             download_progress[download_id]['status'] = 'completed'
             download_progress[download_id]['progress'] = 100
+            download_progress[download_id]['downloaded'] = downloaded
 
         # Save to model_metadata.json (single source of truth)
-        clean_url = url.split('?')[0] if 'civitai.com' in url else url
-        source = 'civitai' if 'civitai.com' in url else ('huggingface' if 'huggingface.co' in url else 'direct')
+        clean_url = url.split('?')[0] if source == 'civitai' else url
         hf_repo, hf_path = extract_huggingface_info(url)
 
         metadata = load_model_metadata()
@@ -3224,14 +3548,15 @@ def _download_from_url_thread(download_id, url, filename, target_dir):
             'url_source': 'download',
             'source': source,
             'type': target_dir,
-            'downloaded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            'downloaded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **file_hash_fields(dest_file, hasher.hexdigest())
         }
         if hf_repo:
             entry['hf_repo'] = hf_repo
             entry['hf_path'] = hf_path
-        if 'civitai.com' in url:
+        if source == 'civitai':
             # Try to extract model ID
-            match = re.search(r'/models/(\d+)', url)
+            match = CIVITAI_MODELS_PATH_RE.search(url)
             if match:
                 entry['civitai_model_id'] = match.group(1)
         metadata[filename] = entry
@@ -3431,11 +3756,12 @@ def load_node_metadata():
         return _node_metadata_cache
     try:
         if os.path.exists(NODE_METADATA_FILE):
-            with open(NODE_METADATA_FILE, 'r', encoding='utf-8') as f:
-                _node_metadata_cache = json.load(f)
+            with open(NODE_METADATA_FILE, 'rb') as f:
+                _node_metadata_cache = _json_loads_lenient(f.read())
                 return _node_metadata_cache
     except Exception as e:
         logging.error(f"[WMD] Error loading node metadata: {e}")
+        set_aside_unreadable(NODE_METADATA_FILE)
     _node_metadata_cache = {}
     return _node_metadata_cache
 
@@ -3444,8 +3770,7 @@ def save_node_metadata(metadata):
     """Save the node metadata database"""
     global _node_metadata_cache
     try:
-        with open(NODE_METADATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        write_text_atomic(NODE_METADATA_FILE, _json_dumps(metadata))
         _node_metadata_cache = metadata
         return True
     except Exception as e:
@@ -3463,7 +3788,7 @@ def fetch_node_from_registry(node_name):
     """Dynamic lookup: Fetch single node info from ComfyUI Registry API"""
     try:
         url = COMFY_REGISTRY_GET_NODE.format(node_name=node_name)
-        response = requests.get(url, timeout=10)
+        response = http_session.get(url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             return {
@@ -3491,7 +3816,7 @@ def fetch_bulk_nodes_from_registry(page=1, page_size=100):
     """Bulk fetch: Get paginated list of nodes from ComfyUI Registry"""
     try:
         url = f"{COMFY_REGISTRY_LIST_NODES}?page={page}&pageSize={page_size}"
-        response = requests.get(url, timeout=30)
+        response = http_session.get(url, timeout=30)
         if response.status_code == 200:
             data = response.json()
             return data.get('comfy_nodes', []), data.get('total', 0)
@@ -3518,6 +3843,7 @@ async def scan_node_metadata(request):
         from_registry = 0
         from_extension_map = 0
         updated = 0
+        scanned_at = time.strftime('%Y-%m-%dT%H:%M:%S')  # One timestamp for the whole scan
 
         # Source 1: ComfyUI Registry API (bulk fetch with pagination)
         if include_registry:
@@ -3554,7 +3880,7 @@ async def scan_node_metadata(request):
                         'deprecated': node.get('deprecated', False),
                         'experimental': node.get('experimental', False),
                         'source': 'comfy_registry',
-                        'scanned_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+                        'scanned_at': scanned_at
                     }
 
                     new_metadata[node_name] = entry
@@ -3583,6 +3909,14 @@ async def scan_node_metadata(request):
             extension_info = node_data[1] if len(node_data) > 1 else {}
             extension_name = extension_info.get('title', '') if isinstance(extension_info, dict) else ''
 
+            # Check if installed (once per extension, not per node)
+            try:
+                repo_name = github_url.rstrip('/').split('/')[-1]
+                custom_nodes_path = os.path.join(folder_paths.base_path, 'custom_nodes', repo_name)
+                installed = os.path.exists(custom_nodes_path)
+            except Exception:
+                installed = None
+
             for node_type in node_list:
                 if not node_type:
                     continue
@@ -3593,14 +3927,8 @@ async def scan_node_metadata(request):
                 # Add/update GitHub info
                 entry['github_url'] = github_url
                 entry['extension_name'] = extension_name
-
-                # Check if installed
-                try:
-                    repo_name = github_url.rstrip('/').split('/')[-1]
-                    custom_nodes_path = os.path.join(folder_paths.base_path, 'custom_nodes', repo_name)
-                    entry['installed'] = os.path.exists(custom_nodes_path)
-                except Exception:
-                    pass
+                if installed is not None:
+                    entry['installed'] = installed
 
                 # Update source if this is new info
                 if entry.get('source') != 'comfy_registry':
@@ -3608,7 +3936,7 @@ async def scan_node_metadata(request):
                 else:
                     entry['source'] = 'comfy_registry+extension_map'
 
-                entry['scanned_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+                entry['scanned_at'] = scanned_at
 
                 if node_type not in new_metadata:
                     from_extension_map += 1
@@ -3641,7 +3969,7 @@ async def get_all_node_metadata(request):
             'success': True,
             'metadata': metadata,
             'count': len(metadata)
-        })
+        }, dumps=_json_dumps)
     except Exception as e:
         logging.error(f"[WMD] Get node metadata error: {e}")
         return web.json_response({'error': str(e)}, status=500)
@@ -3722,7 +4050,7 @@ def extract_safetensors_metadata(file_path):
 
             # Read header JSON
             header_json = f.read(header_size)
-            header = json.loads(header_json.decode('utf-8'))
+            header = _json_loads_lenient(header_json)
 
             # Extract __metadata__ section if present
             metadata = header.get('__metadata__', {})
@@ -3849,7 +4177,7 @@ async def find_and_save_model_url(request):
                     entry['hf_path'] = hf_path
             elif 'civitai.com' in url:
                 entry['source'] = 'civitai'
-                match = re.search(r'/models/(\d+)', url)
+                match = CIVITAI_MODELS_PATH_RE.search(url)
                 if match:
                     entry['civitai_model_id'] = match.group(1)
 
@@ -3895,6 +4223,7 @@ async def scan_model_metadata(request):
         from_safetensors = 0
         from_model_list = 0
         errors = 0
+        scanned_at = time.strftime('%Y-%m-%dT%H:%M:%S')  # One timestamp for the whole scan
 
         # Valid model file extensions
         MODEL_EXTENSIONS = {'.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.onnx'}
@@ -3937,7 +4266,11 @@ async def scan_model_metadata(request):
 
                     try:
                         full_path = folder_paths.get_full_path(folder_type, filename)
-                        if not full_path or not os.path.exists(full_path):
+                        if not full_path:
+                            continue
+                        try:
+                            stat = os.stat(full_path)
+                        except FileNotFoundError:
                             continue
 
                         scanned += 1
@@ -3947,9 +4280,12 @@ async def scan_model_metadata(request):
                             'filename': basename,
                             'type': folder_type,
                             'path': full_path,
-                            'scanned_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+                            'scanned_at': scanned_at
                         }
 
+                        # Keep a recorded SHA256 while the file is unchanged, so hash lookups don't re-hash it
+                        info.update(cached_hash_fields(existing_entry, stat))
+
                         # Preserve user-provided URL (highest priority)
                         if user_url:
                             info['user_url'] = user_url
@@ -4024,7 +4360,7 @@ async def get_all_model_metadata(request):
             'success': True,
             'metadata': metadata,
             'count': len(metadata)
-        })
+        }, dumps=_json_dumps)
     except Exception as e:
         logging.error(f"[WMD] Get metadata error: {e}")
         return web.json_response({'error': str(e)}, status=500)
@@ -4064,11 +4400,9 @@ async def get_model_url(request):
             meta = model_metadata[basename]
         # 3. Try case-insensitive match
         else:
-            filename_lower = basename.lower()
-            for key in model_metadata:
-                if key.lower() == filename_lower or os.path.basename(key).lower() == filename_lower:
-                    meta = model_metadata[key]
-                    break
+            key = find_model_metadata_key(basename)
+            if key is not None:
+                meta = model_metadata[key]
 
         if meta:
             result['url'] = meta.get('url')
@@ -4086,14 +4420,7 @@ async def get_model_url(request):
             result['metadata_source'] = 'runtime_cache'
         else:
             # Check popular-models.json (curated list)
-            popular_models = load_popular_models()
-            popular_meta = popular_models.get(basename)
-            if not popular_meta:
-                # Try case-insensitive match
-                for key, val in popular_models.items():
-                    if key.lower() == basename.lower():
-                        popular_meta = val
-                        break
+            popular_meta = get_popular_model_info(basename)
 
             if popular_meta:
                 result['url'] = popular_meta.get('url')
@@ -4105,13 +4432,7 @@ async def get_model_url(request):
                 result['metadata_source'] = 'popular_models'
             else:
                 # Check model-list.json (ComfyUI Manager)
-                model_list = load_model_list()
-                model_list_meta = None
-                for model_info in model_list:
-                    model_filename = model_info.get('filename', '')
-                    if model_filename.lower() == basename.lower():
-                        model_list_meta = model_info
-                        break
+                model_list_meta = get_model_list_entry(basename)
 
                 if model_list_meta:
                     result['url'] = model_list_meta.get('url')
@@ -4166,7 +4487,7 @@ async def save_model_url(request):
         elif 'civitai.com' in url:
             entry['source'] = 'civitai'
             # Try to extract model ID from URL
-            match = re.search(r'/models/(\d+)', url)
+            match = CIVITAI_MODELS_PATH_RE.search(url)
             if match:
                 entry['civitai_model_id'] = match.group(1)
 
@@ -4182,6 +4503,18 @@ async def save_model_url(request):
         return web.json_response({'error': str(e)}, status=500)
 
 
+# Markdown patterns for the README preview (# -> h2, ## -> h3, ### -> h4)
+README_HEADER_RE = re.compile(r'^(#{1,3}) (.+)$', re.MULTILINE)
+README_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+README_ITALIC_RE = re.compile(r'\*(.+?)\*')
+README_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+
+
+def _readme_header(match):
+    level = len(match.group(1)) + 1
+    return f'<h{level}>{match.group(2)}</h{level}>'
+
+
 @routes.get("/workflow-models/hf-readme")
 async def get_hf_readme(request):
     """Fetch README from a HuggingFace repo"""
@@ -4191,7 +4524,7 @@ async def get_hf_readme(request):
             return web.json_response({'error': 'Valid HuggingFace URL required'}, status=400)
 
         # Extract repo from URL (e.g., https://huggingface.co/owner/repo/...)
-        match = re.search(r'huggingface\.co/([^/]+/[^/]+)', url)
+        match = HF_REPO_RE.search(url)
         if not match:
             return web.json_response({'readme': None, 'error': 'Could not parse repo from URL'})
 
@@ -4201,21 +4534,18 @@ async def get_hf_readme(request):
         readme_url = f"https://huggingface.co/{repo_id}/raw/main/README.md"
 
         try:
-            response = requests.get(readme_url, timeout=10)
+            response = http_session.get(readme_url, timeout=10)
             if response.status_code == 200:
                 readme_content = response.text
 
                 # Simple markdown to HTML conversion for display
                 # Convert headers
-                readme_html = readme_content
-                readme_html = re.sub(r'^### (.+)$', r'<h4>\1</h4>', readme_html, flags=re.MULTILINE)
-                readme_html = re.sub(r'^## (.+)$', r'<h3>\1</h3>', readme_html, flags=re.MULTILINE)
-                readme_html = re.sub(r'^# (.+)$', r'<h2>\1</h2>', readme_html, flags=re.MULTILINE)
+                readme_html = README_HEADER_RE.sub(_readme_header, readme_content)
                 # Convert bold/italic
-                readme_html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', readme_html)
-                readme_html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', readme_html)
+                readme_html = README_BOLD_RE.sub(r'<strong>\1</strong>', readme_html)
+                readme_html = README_ITALIC_RE.sub(r'<em>\1</em>', readme_html)
                 # Convert links
-                readme_html = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2" target="_blank">\1</a>', readme_html)
+                readme_html = README_LINK_RE.sub(r'<a href="\2" target="_blank">\1</a>', readme_html)
                 # Convert line breaks
                 readme_html = readme_html.replace('\n\n', '</p><p>')
                 readme_html = f'<p>{readme_html}</p>'
@@ -4256,20 +4586,10 @@ async def get_installed_models(request):
             'llm_gguf', 'CogVideo', 'TIPO', 'blip', 'nsfw_detector', 'mediapipe'
         ])
 
-        # Folders to exclude (not model folders)
-        EXCLUDED_FOLDERS = {
-            'custom_nodes', 'configs', 'fonts', 'kjnodes_fonts', 'web', 'js',
-            'user', 'input', 'output', 'temp', 'models', 'pycache'
-        }
-
         # Add custom folder types from folder_paths, but only if they look like model folders
         if hasattr(folder_paths, 'folder_names_and_paths'):
             for folder_type in folder_paths.folder_names_and_paths.keys():
-                # Skip excluded folders
-                if folder_type.lower() in EXCLUDED_FOLDERS:
-                    continue
-                # Skip if folder name contains certain patterns
-                if any(x in folder_type.lower() for x in ['pycache', '_cache', 'config', 'font']):
+                if is_excluded_folder_type(folder_type):
                     continue
                 model_types.add(folder_type)
 
@@ -4302,7 +4622,7 @@ async def get_installed_models(request):
                 logging.debug(f"[WMD] Error scanning {folder_type}: {e}")
                 continue
 
-        return web.json_response({'models': models})
+        return web.json_response({'models': models}, dumps=_json_dumps)
     except Exception as e:
         logging.error(f"[WMD] Error getting installed models: {e}")
         return web.json_response({'error': str(e)}, status=500)
@@ -4423,8 +4743,8 @@ def load_model_aliases():
     """Load model aliases from model-aliases.json"""
     try:
         if os.path.exists(MODEL_ALIASES_FILE):
-            with open(MODEL_ALIASES_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(MODEL_ALIASES_FILE, 'rb') as f:
+                return _json_loads(f.read())
     except Exception as e:
         logging.error(f"[WMD] Error loading model aliases: {e}")
 
@@ -4462,10 +4782,57 @@ def resolve_model_alias(filename):
     return filename  # No alias found
 
 
+def _indel_cutoff(score_cutoff):
+    """rapidfuzz score_cutoff (0-100) for a SequenceMatcher cutoff, with slack for float rounding"""
+    return max(min(score_cutoff, 1.0) * 100 - 1e-6, 0.0)
+
+
+def _similarity_ratio(a, b, score_cutoff=0.0):
+    """SequenceMatcher ratio of two names; returns 0.0 once it is known to be below score_cutoff"""
+    matcher = SequenceMatcher(None, a, b)
+    if _rapidfuzz is not None:
+        # The InDel ratio (LCS based) is an upper bound of SequenceMatcher.ratio(), computed in C
+        if score_cutoff > 0 and not _rapidfuzz.ratio(a, b, score_cutoff=_indel_cutoff(score_cutoff)):
+            return 0.0
+    # Cheap upper bounds (length-only, then character multiset) before the full match
+    elif matcher.real_quick_ratio() < score_cutoff or matcher.quick_ratio() < score_cutoff:
+        return 0.0
+    ratio = matcher.ratio()
+    return ratio if ratio >= score_cutoff else 0.0
+
+
+@lru_cache(maxsize=16384)
+def _fuzzy_base_name(filename):
+    """Lowercased filename without extension, as compared by fuzzy matching"""
+    return os.path.splitext(filename)[0].lower()
+
+
+def _fuzzy_scores(base_name, names, threshold):
+    """(index, ratio, is_exact) for names matching base_name at or above threshold, in input order"""
+    bases = [_fuzzy_base_name(name) for name in names]
+    results = []
+    candidates = range(len(bases))
+    if _rapidfuzz_process is not None:
+        # Prune the whole list in one C call by the InDel upper bound; exact base names always score 100
+        hits = _rapidfuzz_process.extract(base_name, bases, scorer=_rapidfuzz.ratio, processor=None,
+                                          score_cutoff=_indel_cutoff(threshold), limit=None)
+        candidates = sorted(idx for _, _, idx in hits)
+
+    for idx in candidates:
+        base = bases[idx]
+        if base == base_name:
+            results.append((idx, 1.0, True))
+            continue
+        ratio = _similarity_ratio(base_name, base, threshold)
+        if ratio >= threshold:
+            results.append((idx, ratio, False))
+    return results
+
+
 def fuzzy_match_model(filename, threshold=0.70):
     """Find similar models with confidence scores"""
     matches = []
-    base_name = os.path.splitext(filename)[0].lower()
+    base_name = _fuzzy_base_name(filename)
 
     # First, check if this is an alias
     canonical = resolve_model_alias(filename)
@@ -4478,86 +4845,21 @@ def fuzzy_match_model(filename, threshold=0.70):
             'url': None  # Will be looked up separately
         })
 
-    # Search in model-list.json
-    model_list = load_model_list()
-    for model in model_list:
-        model_filename = model.get('filename', '')
-        model_base = os.path.splitext(model_filename)[0].lower()
-
-        # Exact match
-        if model_base == base_name:
-            matches.append({
-                'filename': model_filename,
-                'url': model.get('url', ''),
-                'confidence': 100,
-                'match_type': 'exact',
-                'source': 'model_list'
-            })
-            continue
-
-        # Fuzzy match using SequenceMatcher
-        ratio = SequenceMatcher(None, base_name, model_base).ratio()
-        if ratio >= threshold:
-            matches.append({
-                'filename': model_filename,
-                'url': model.get('url', ''),
-                'confidence': int(ratio * 100),
-                'match_type': 'fuzzy',
-                'source': 'model_list'
-            })
-
-    # Search in popular-models.json
-    popular_models = load_popular_models()
-    for model_name, model_info in popular_models.items():
-        model_base = os.path.splitext(model_name)[0].lower()
-
-        # Exact match
-        if model_base == base_name:
-            matches.append({
-                'filename': model_name,
-                'url': model_info.get('url', ''),
-                'confidence': 100,
-                'match_type': 'exact',
-                'source': 'popular_models'
-            })
-            continue
-
-        # Fuzzy match
-        ratio = SequenceMatcher(None, base_name, model_base).ratio()
-        if ratio >= threshold:
-            matches.append({
-                'filename': model_name,
-                'url': model_info.get('url', ''),
-                'confidence': int(ratio * 100),
-                'match_type': 'fuzzy',
-                'source': 'popular_models'
-            })
-
-    # Search in search_cache.json for previously found models
-    search_cache = load_search_cache()
-    for cached_name, cached_info in search_cache.items():
-        cached_base = os.path.splitext(cached_name)[0].lower()
-
-        # Exact match
-        if cached_base == base_name:
-            matches.append({
-                'filename': cached_name,
-                'url': cached_info.get('url', ''),
-                'confidence': 100,
-                'match_type': 'exact',
-                'source': 'search_cache'
-            })
-            continue
-
-        # Fuzzy match
-        ratio = SequenceMatcher(None, base_name, cached_base).ratio()
-        if ratio >= threshold:
+    # Search model-list.json, popular-models.json and previously found models in model_metadata.json
+    sources = (
+        ('model_list', [(model.get('filename', ''), model) for model in load_model_list()]),
+        ('popular_models', list(load_popular_models().items())),
+        ('search_cache', list(_get_model_metadata_safe().items())),
+    )
+    for source, entries in sources:
+        for idx, ratio, is_exact in _fuzzy_scores(base_name, [name for name, _ in entries], threshold):
+            name, info = entries[idx]
             matches.append({
-                'filename': cached_name,
-                'url': cached_info.get('url', ''),
-                'confidence': int(ratio * 100),
-                'match_type': 'fuzzy',
-                'source': 'search_cache'
+                'filename': name,
+                'url': info.get('url', ''),
+                'confidence': 100 if is_exact else int(ratio * 100),
+                'match_type': 'exact' if is_exact else 'fuzzy',
+                'source': source
             })
 
     # Remove duplicates (keep highest confidence)
@@ -4631,7 +4933,7 @@ def guess_model_type_from_filename(filename, url_path=''):
         return 'Inpaint', 'inpaint'
     elif any(x in check_text for x in ['/checkpoint/', '/checkpoints/']):
         return 'Checkpoint', 'checkpoints'
-    elif filename_lower.endswith('.safetensors') or filename_lower.endswith('.ckpt'):
+    elif filename_lower.endswith(('.safetensors', '.ckpt')):
         # Default to checkpoint for .safetensors/.ckpt files
         return 'Checkpoint', 'checkpoints'
     else:
@@ -4664,7 +4966,7 @@ async def analyze_url_endpoint(request):
             # Try to get model info from CivitAI API using version ID
             try:
                 api_url = f"https://civitai.com/api/v1/model-versions/{version_id}"
-                api_response = requests.get(api_url, timeout=10)
+                api_response = http_session.get(api_url, timeout=10)
                 if api_response.status_code == 200:
                     version_data = api_response.json()
                     files = version_data.get('files', [])
@@ -4674,11 +4976,7 @@ async def analyze_url_endpoint(request):
                         filename = primary_file.get('name', '')
                         file_size = primary_file.get('sizeKB', 0)
                         if file_size:
-                            size_mb = file_size / 1024
-                            if size_mb >= 1024:
-                                size = f"{size_mb/1024:.2f} GB"
-                            else:
-                                size = f"{size_mb:.1f} MB"
+                            size = format_model_size(file_size * 1024)
             except Exception as e:
                 logging.warning(f"[WMD] Could not fetch CivitAI version info: {e}")
 
@@ -4687,7 +4985,7 @@ async def analyze_url_endpoint(request):
             source = 'HuggingFace'
             # Extract filename from HF URL
             # Format: huggingface.co/repo/model/resolve/main/path/to/file.safetensors
-            hf_match = re.search(r'huggingface\.co/([^/]+/[^/]+)(?:/resolve/[^/]+)?/(.+?)(?:\?|$)', url)
+            hf_match = HF_RESOLVE_PATH_RE.search(url)
             if hf_match:
                 path = hf_match.group(2)
                 filename = path.split('/')[-1]
@@ -4716,13 +5014,13 @@ async def analyze_url_endpoint(request):
                         else:
                             url = f"{url}?token={civitai_key}"
 
-                response = requests.head(url, headers=headers, allow_redirects=True, timeout=15)
+                response = http_session.head(url, headers=headers, allow_redirects=True, timeout=15)
 
                 # Try Content-Disposition header
                 cd = response.headers.get('Content-Disposition', '')
                 if 'filename=' in cd:
                     # Parse filename from header
-                    match = re.search(r'filename[*]?=["\']?([^"\';\n]+)', cd)
+                    match = CONTENT_DISPOSITION_FILENAME_RE.search(cd)
                     if match:
                         filename = match.group(1).strip()
                         # Handle UTF-8 encoded filenames
@@ -4732,12 +5030,7 @@ async def analyze_url_endpoint(request):
                 # Get size from Content-Length
                 content_length = response.headers.get('Content-Length')
                 if content_length:
-                    size_bytes = int(content_length)
-                    size_mb = size_bytes / (1024 * 1024)
-                    if size_mb >= 1024:
-                        size = f"{size_mb/1024:.2f} GB"
-                    else:
-                        size = f"{size_mb:.1f} MB"
+                    size = format_model_size(int(content_length))
 
             except Exception as e:
                 logging.warning(f"[WMD] Could not fetch URL headers: {e}")
@@ -4781,6 +5074,10 @@ async def analyze_url_endpoint(request):
 # aria2 Integration with Resume Support
 # ============================================================================
 
+# Parallel HTTP range connections per file for aria2c (CDNs throttle per connection)
+ARIA2_CONNECTIONS = 8
+
+
 def check_aria2_available():
     """Check if aria2c is installed and available"""
     try:
@@ -4795,8 +5092,6 @@ def check_aria2_available():
 
 def _download_with_aria2(url, dest_path, download_id, headers=None):
     """Download using aria2c with resume support"""
-    global active_download_count
-
     try:
         aria2_path = shutil.which('aria2c')
         if not aria2_path:
@@ -4810,8 +5105,8 @@ def _download_with_aria2(url, dest_path, download_id, headers=None):
             '--dir=' + dest_dir,
             '--out=' + dest_file,
             '--continue=true',           # Resume support
-            '--max-connection-per-server=4',
-            '--split=4',
+            f'--max-connection-per-server={ARIA2_CONNECTIONS}',
+            f'--split={ARIA2_CONNECTIONS}',
             '--min-split-size=1M',
             '--file-allocation=none',
             '--console-log-level=error',
@@ -4856,13 +5151,12 @@ def _download_with_aria2(url, dest_path, download_id, headers=None):
                 time.sleep(0.5)
 
                 # Check file size for progress
-                if os.path.exists(dest_path):
-                    current_size = os.path.getsize(dest_path)
-                    with download_lock:
-                        download_progress[download_id]['downloaded'] = current_size
-                        total = download_progress[download_id].get('total_size', 0)
-                        if total > 0:
-                            download_progress[download_id]['progress'] = int((current_size / total) * 100)
+                current_size = os.path.getsize(dest_path)
+                with download_lock:
+                    download_progress[download_id]['downloaded'] = current_size
+                    total = download_progress[download_id].get('total_size', 0)
+                    if total > 0:
+                        download_progress[download_id]['progress'] = int((current_size / total) * 100)
             except Exception:
                 pass
 
@@ -4878,35 +5172,33 @@ def _download_with_aria2(url, dest_path, download_id, headers=None):
 
     except Exception as e:
         return False, str(e)
-    finally:
-        with download_queue_lock:
-            active_download_count = max(0, active_download_count - 1)
 
 
 def _download_native_with_resume(url, dest_path, download_id, headers=None):
     """Download using requests with resume support (.partial file tracking)"""
-    global active_download_count
-
     partial_path = dest_path + '.partial'
     resume_byte = 0
 
     # Check for existing partial download
-    if os.path.exists(partial_path):
+    try:
         resume_byte = os.path.getsize(partial_path)
         logging.info(f"[WMD] Resuming download from byte {resume_byte}")
+    except FileNotFoundError:
+        pass
 
     req_headers = headers.copy() if headers else {}
     if resume_byte > 0:
         req_headers['Range'] = f'bytes={resume_byte}-'
 
     try:
-        response = requests.get(url, stream=True, timeout=30, allow_redirects=True, headers=req_headers)
+        response = download_session.get(url, stream=True, timeout=30, allow_redirects=True, headers=req_headers)
 
         # Check if server supports resume
         if resume_byte > 0 and response.status_code != 206:
             # Server doesn't support resume, start from beginning
             resume_byte = 0
-            response = requests.get(url, stream=True, timeout=30, allow_redirects=True, headers=headers or {})
+            response.close()
+            response = download_session.get(url, stream=True, timeout=30, allow_redirects=True, headers=headers or {})
 
         response.raise_for_status()
 
@@ -4923,37 +5215,44 @@ def _download_native_with_resume(url, dest_path, download_id, headers=None):
         mode = 'ab' if resume_byte > 0 else 'wb'
         downloaded = resume_byte
 
+        # Hash while streaming; on resume only the existing partial bytes are read back
+        hasher = hashlib.sha256()
+        if resume_byte > 0:
+            with open(partial_path, 'rb') as pf:
+                while chunk := pf.read(DOWNLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+
+        last_progress_update = 0
         with open(partial_path, mode) as f:
-            for chunk in response.iter_content(chunk_size=1024*1024):  # 1MB chunks for faster downloads
+            for chunk in iter_download_chunks(response):
                 # Check for cancellation
                 if download_id in cancelled_downloads:
                     return False, "Cancelled"
 
                 if chunk:
                     f.write(chunk)
+                    hasher.update(chunk)
                     downloaded += len(chunk)
-                    with download_lock:
-                        download_progress[download_id]['downloaded'] = downloaded
-                        if total_size > 0:
-                            download_progress[download_id]['progress'] = int((downloaded / total_size) * 100)
+                    now = time.monotonic()
+                    if now - last_progress_update >= PROGRESS_UPDATE_INTERVAL:
+                        last_progress_update = now
+                        set_download_progress(download_id, downloaded, total_size)
+
+        # Rename partial to final (atomically replaces any existing file)
+        os.replace(partial_path, dest_path)
 
-        # Rename partial to final
-        if os.path.exists(dest_path):
-            os.remove(dest_path)
-        os.rename(partial_path, dest_path)
+        save_search_metadata(dest_path, file_hash_fields(dest_path, hasher.hexdigest()))
 
         with download_lock:
             download_progress[download_id]['status'] = 'completed'
             download_progress[download_id]['progress'] = 100
+            download_progress[download_id]['downloaded'] = downloaded
 
         return True, None
 
     except Exception as e:
         # Keep partial file for resume
         return False, str(e)
-    finally:
-        with download_queue_lock:
-            active_download_count = max(0, active_download_count - 1)
 
 
 # ============================================================================
@@ -4961,16 +5260,19 @@ def _download_native_with_resume(url, dest_path, download_id, headers=None):
 # ============================================================================
 
 download_queue_worker_running = False
+download_queue_worker_lock = threading.Lock()
 
 
 def start_download_queue_worker():
     """Start the background download queue worker if not already running"""
     global download_queue_worker_running
 
-    if download_queue_worker_running:
-        return
+    # Check-and-set under a lock so concurrent callers can't start two workers
+    with download_queue_worker_lock:
+        if download_queue_worker_running:
+            return
+        download_queue_worker_running = True
 
-    download_queue_worker_running = True
     worker_thread = threading.Thread(target=_download_queue_worker, daemon=True)
     worker_thread.start()
     logging.info("[WMD] Download queue worker started")
@@ -4982,6 +5284,13 @@ def _download_queue_worker():
 
     while download_queue_worker_running:
         try:
+            # Unlocked pre-check: skip the lock while idle or saturated. A stale
+            # read only delays a start until the next poll.
+            current_max = max_parallel_downloads
+            if not download_queue or (current_max != 0 and active_download_count >= current_max):
+                time.sleep(0.5)
+                continue
+
             with download_queue_lock:
                 # Check if we can start a new download
                 current_max = max_parallel_downloads
@@ -4991,7 +5300,7 @@ def _download_queue_worker():
                     can_start = active_download_count < current_max and len(download_queue) > 0
 
                 if can_start:
-                    next_download = download_queue.pop(0)
+                    next_download = download_queue.popleft()
                     active_download_count += 1
 
                     # Start download in separate thread
@@ -5051,7 +5360,7 @@ def _process_queued_download(download_info):
 
         # Cache URL on success
         if success:
-            source = 'civitai' if 'civitai.com' in url else ('huggingface' if 'huggingface.co' in url else 'direct')
+            source = download_info.get('source') or get_url_source(url)
             hf_repo, hf_path = extract_huggingface_info(url)
             _cache_download_url(filename, url, source, hf_repo=hf_repo, hf_path=hf_path)
             # Add to download history
@@ -5106,18 +5415,19 @@ async def queue_download_endpoint(request):
                 return web.json_response({'error': 'Invalid CivitAI URN format'}, status=400)
 
         # Generate download ID
-        download_id = f"queued_{filename}_{int(asyncio.get_event_loop().time() * 1000)}".replace('/', '_').replace('\\', '_')
+        download_id = f"queued_{filename}_{next(download_queue_ids)}".replace('/', '_').replace('\\', '_')
 
         # Prepare headers
+        source = get_url_source(url)
         headers = {}
-        if 'civitai.com' in url:
+        if source == 'civitai':
             civitai_key = get_civitai_api_key()
             if civitai_key:
                 if '?' in url:
                     url = f"{url}&token={civitai_key}"
                 else:
                     url = f"{url}?token={civitai_key}"
-        elif 'huggingface.co' in url:
+        elif source == 'huggingface':
             hf_token = get_huggingface_token()
             if hf_token:
                 headers['Authorization'] = f'Bearer {hf_token}'
@@ -5135,7 +5445,8 @@ async def queue_download_endpoint(request):
             'url': url,
             'dest_path': dest_path,
             'filename': filename,
-            'headers': headers
+            'headers': headers,
+            'source': source
         }
 
         with download_queue_lock:
@@ -5217,14 +5528,6 @@ async def set_parallel_downloads(request):
         return web.json_response({'error': str(e)}, status=500)
 
 
-# Initialize max_parallel from settings on load
-def _init_parallel_setting():
-    global max_parallel_downloads
-    settings = load_settings()
-    max_parallel_downloads = settings.get('max_parallel_downloads', 3)
-
-_init_parallel_setting()
-
 # Load Tavily search cache on startup
 load_tavily_cache()
 
@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _RepoRootAsDirectory:
+    """The repo root's __init__.py is the ComfyUI entry point (installs requirements, needs ComfyUI);
+    collect the root as a plain directory so pytest never imports it as a test package"""
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collect_directory(self, path, parent):
+        if str(path) == REPO_ROOT:
+            return pytest.Dir.from_parent(parent, path=path)
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(_RepoRootAsDirectory(), 'wmd-repo-root-as-directory')
@@ -0,0 +1,76 @@
+"""JSON responses must survive filenames that aren't valid UTF-8 (stored as lone surrogates)"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import sys
+import types
+
+import pytest
+from aiohttp import web
+
+SERVER_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server.py')
+# What os.listdir() returns on Linux for the bytes b'caf\xe9.safetensors'
+UNDECODABLE_NAME = 'caf\udce9.safetensors'
+
+
+@pytest.fixture(scope='module')
+def wmd(tmp_path_factory):
+    """server.py loaded from a temp dir (it keeps its state files next to itself) with ComfyUI stubbed"""
+    if sys.platform != 'linux':
+        pytest.skip('needs a filesystem that accepts non-UTF-8 filenames')
+    root = tmp_path_factory.mktemp('wmd')
+    models_dir = root / 'models'
+    (models_dir / 'checkpoints').mkdir(parents=True)
+    with open(os.path.join(os.fsencode(models_dir / 'checkpoints'), b'caf\xe9.safetensors'), 'wb') as f:
+        f.write(b'\0' * 16)
+
+    folder_paths = types.ModuleType('folder_paths')
+    folder_paths.base_path = str(root)
+    folder_paths.models_dir = str(models_dir)
+    folder_paths.folder_names_and_paths = {}
+    folder_paths.get_folder_paths = lambda folder_type: [str(models_dir / folder_type)]
+    folder_paths.get_filename_list = lambda folder_type: (
+        os.listdir(models_dir / folder_type) if (models_dir / folder_type).is_dir() else [])
+    folder_paths.get_full_path = lambda folder_type, filename: str(models_dir / folder_type / filename)
+    server_stub = types.ModuleType('server')
+    server_stub.PromptServer = types.SimpleNamespace(instance=types.SimpleNamespace(routes=web.RouteTableDef()))
+
+    saved_modules = {name: sys.modules.get(name) for name in ('folder_paths', 'server')}
+    sys.modules.update({'folder_paths': folder_paths, 'server': server_stub})
+    shutil.copy(SERVER_PY, root / 'wmd_server.py')
+    spec = importlib.util.spec_from_file_location('wmd_server', root / 'wmd_server.py')
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        if getattr(module, '_file_handler', None):
+            logging.getLogger().removeHandler(module._file_handler)
+            module._file_handler.close()
+        for name, saved in saved_modules.items():
+            if saved is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = saved
+
+
+def test_json_dumps_falls_back_for_surrogates(wmd):
+    assert json.loads(wmd._json_dumps({UNDECODABLE_NAME: {'url': 'u'}})) == {UNDECODABLE_NAME: {'url': 'u'}}
+
+
+def test_installed_models_lists_undecodable_filename(wmd):
+    response = asyncio.run(wmd.get_installed_models(None))
+    assert response.status == 200
+    names = [model['filename'] for model in json.loads(response.text)['models']]
+    assert UNDECODABLE_NAME in names
+
+
+def test_model_metadata_with_undecodable_filename(wmd):
+    wmd.save_search_metadata(UNDECODABLE_NAME, {'url': 'https://example.com/model'})
+    response = asyncio.run(wmd.get_all_model_metadata(None))
+    assert response.status == 200
+    assert json.loads(response.text)['metadata'][UNDECODABLE_NAME]['url'] == 'https://example.com/model'
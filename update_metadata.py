@@ -231,7 +231,7 @@ def show_metadata_stats():
                 elif filename == 'custom-node-list.json':
                     nodes = data.get('custom_nodes', [])
                     print(f"  Custom nodes: {len(nodes)}")
-            except:
+            except Exception:
                 pass
 
             print(f"  Size: {format_size(size)}")